@@ -1,33 +1,35 @@
 import os
-import torch
+import sys
 
 # FORCE ONLINE MODE AT THE CORE LEVEL
 os.environ["TRANSFORMERS_OFFLINE"] = "0"
 os.environ["HF_HUB_OFFLINE"] = "0"
 
-from transformers import AutoProcessor, AutoModelForCausalLM
+# Share the app's Inductor cache so the warm-up below is reused at launch
+ROOT = os.path.dirname(os.path.abspath(__file__))
+os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", os.path.join(ROOT, ".inductor_cache"))
+sys.path.append(os.path.join(ROOT, "src"))
+
+from ai.engine import ChartDetector
+from core.config import settings
 
 model_id = "microsoft/Florence-2-base"
 
 print(f"--- Starting Forced Online Download of {model_id} ---")
 
 try:
-    # We add local_files_only=False to double-down on the instruction
-    model = AutoModelForCausalLM.from_pretrained(
-        model_id, 
-        trust_remote_code=True, 
-        torch_dtype=torch.float16,
-        local_files_only=False
-    ).to("cuda").eval()
-
-    processor = AutoProcessor.from_pretrained(
-        model_id, 
-        trust_remote_code=True,
-        local_files_only=False
-    )
-    print("--- SUCCESS: Model downloaded and verified! ---")
-    
+    # ChartDetector downloads the weights and processor on first load
+    # (online mode is forced above) and picks BF16/FP16/FP32 for the device,
+    # so the model is loaded exactly once
+    detector = ChartDetector()
+    print(f"--- SUCCESS: Model downloaded and verified! ({detector.device}, {detector.model.dtype}) ---")
+
+    # Run one representative detection so torch.compile populates the Inductor cache
+    if settings.compile_detector:
+        detector.prepare()
+        print("--- SUCCESS: Detector warmed up, compile cache written ---")
+
 except Exception as e:
     print(f"--- FAILURE: {e} ---")
 
-# pip install --force-reinstall transformers==4.48.3
\ No newline at end of file
+# pip install --force-reinstall transformers==4.48.3
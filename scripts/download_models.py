@@ -2,27 +2,54 @@
 Precision Color Auditor - Model Hydration Script
 Downloads the Florence-2 model weights to the local resources folder.
 Run this script once after cloning the repository.
+
+Optional: `pip install hf_transfer` for a much faster Rust download backend.
 """
 
 import os
-from huggingface_hub import snapshot_download
+import importlib.util
+from huggingface_hub import HfApi, snapshot_download
+
+REPO_ID = "microsoft/Florence-2-base"
+# huggingface_hub already defaults to 8 workers; downloads are network-bound,
+# so twice that helps on fast links. HF_DOWNLOAD_WORKERS overrides it.
+DOWNLOAD_WORKERS = int(os.environ.get("HF_DOWNLOAD_WORKERS", 16))
+
+def _weight_patterns(repo_id: str) -> list[str]:
+    """Returns the files from_pretrained needs, skipping duplicate weight formats."""
+    patterns = ["*.json", "configuration_*.py", "modeling_*.py", "processing_*.py", "tokenizer*", "*.txt"]
+    repo_files = HfApi().list_repo_files(repo_id)
+    if any(name.endswith(".safetensors") for name in repo_files):
+        patterns.append("*.safetensors")
+    else:
+        patterns.append("*.bin")
+    return patterns
 
 def hydrate_models():
     # Define the target directory relative to this script
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     target_dir = os.path.join(base_dir, "src", "resources", "models", "florence2")
 
+    # hf_transfer is only honoured when installed; the hub errors out otherwise
+    if importlib.util.find_spec("hf_transfer") is not None:
+        os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+
     print(f"[*] Initializing model download to: {target_dir}")
     
     try:
         snapshot_download(
-            repo_id="microsoft/Florence-2-base",
+            repo_id=REPO_ID,
             local_dir=target_dir,
-            local_dir_use_symlinks=False
+            local_dir_use_symlinks=False,
+            # Shards download in parallel and files already present in
+            # target_dir are skipped on re-runs.
+            allow_patterns=_weight_patterns(REPO_ID),
+            max_workers=DOWNLOAD_WORKERS,
+            etag_timeout=30
         )
         print("[+] Model hydration complete.")
     except Exception as e:
         print(f"[!] Error downloading models: {e}")
 
 if __name__ == "__main__":
-    hydrate_models()
\ No newline at end of file
+    hydrate_models()
@@ -7,11 +7,25 @@ Returns raw AI detection points on the original image buffer.
 
 import numpy as np
 import cv2
-from core.config import settings
 
 class ChartLocator:
     def __init__(self, engine):
-        self.engine = engine
+        """
+        Args:
+            engine: A ChartDetector, or a zero-argument factory (e.g. the
+                ChartDetector class) that is only called on the first AI
+                detection. Manual-corner sessions then never load Florence-2.
+        """
+        self._engine_or_factory = engine
+        # Reusable 8-bit working images for _refine_corners, keyed by role
+        self._scratch_bufs: dict[str, np.ndarray] = {}
+
+    @property
+    def engine(self):
+        """The detector, instantiated from the factory on first access."""
+        if callable(self._engine_or_factory):
+            self._engine_or_factory = self._engine_or_factory()
+        return self._engine_or_factory
 
     def locate(self, display_buffer: np.ndarray, audit_buffer: np.ndarray, 
             manual_corners: np.ndarray = None, use_snap: bool = True) -> tuple[np.ndarray, str]:
@@ -32,7 +46,27 @@ class ChartLocator:
             # Use the fallback method instead of detect_chart_roi
             roi_result, reasoning = self.engine.detect_with_fallback(display_buffer, audit_buffer)
             poly_points = self.engine.extract_polygons(roi_result, width, height)
-        
+
+        return self._finalize_points(display_buffer, poly_points, reasoning, use_snap)
+
+    def locate_batch(self, display_buffers: list, audit_buffers: list,
+                     use_snap: bool = True) -> list[tuple[np.ndarray, str]]:
+        """
+        AI-locates several frames through a single batched Florence-2 pass.
+        Returns one (refined_points, ai_reasoning_string) tuple per frame.
+        """
+        detections = self.engine.detect_with_fallback_batch(display_buffers, audit_buffers)
+
+        located = []
+        for display_buffer, (roi_result, reasoning) in zip(display_buffers, detections):
+            height, width = display_buffer.shape[:2]
+            poly_points = self.engine.extract_polygons(roi_result, width, height)
+            located.append(self._finalize_points(display_buffer, poly_points, reasoning, use_snap))
+        return located
+
+    def _finalize_points(self, display_buffer: np.ndarray, poly_points: np.ndarray,
+                         reasoning: str, use_snap: bool) -> tuple[np.ndarray, str]:
+        """Validates the detected points and optionally snaps them to chart edges."""
         if poly_points is None or len(poly_points) == 0:
             print("[WARNING] Locator: Engine returned no points.")
             return None, reasoning
@@ -46,78 +80,180 @@ class ChartLocator:
         
         return refined_points, reasoning
 
-    def _get_intersection(self, line1, line2):
-        """Calculates the intersection point of two lines."""
-        x1, y1, x2, y2 = line1
-        x3, y3, x4, y4 = line2
-        denom = (y4 - y3) * (x2 - x1) - (x4 - x3) * (y2 - y1)
-        if denom == 0: return None
-        ua = ((x4 - x3) * (y1 - y3) - (y4 - y3) * (x1 - x3)) / denom
-        return np.array([x1 + ua * (x2 - x1), y1 + ua * (y2 - y1)])
+    def _get_intersections(self, lines_a: np.ndarray, lines_b: np.ndarray) -> np.ndarray:
+        """
+        Intersects each segment in lines_a (N, 4) with its partner in lines_b
+        as infinite lines, solving all N 2x2 systems at once (Cramer's rule).
+        Returns (N, 2) points, or None if any pair is parallel.
+        """
+        a = lines_a.astype(np.float64)
+        b = lines_b.astype(np.float64)
+        # Each line as n . p = c, with normal n = (dy, -dx)
+        n_a = np.stack([a[:, 3] - a[:, 1], a[:, 0] - a[:, 2]], axis=1)
+        n_b = np.stack([b[:, 3] - b[:, 1], b[:, 0] - b[:, 2]], axis=1)
+        c_a = np.einsum('ij,ij->i', n_a, a[:, :2])
+        c_b = np.einsum('ij,ij->i', n_b, b[:, :2])
+
+        det = n_a[:, 0] * n_b[:, 1] - n_a[:, 1] * n_b[:, 0]
+        if np.any(det == 0):
+            return None
+        x = (c_a * n_b[:, 1] - c_b * n_a[:, 1]) / det
+        y = (n_a[:, 0] * c_b - n_b[:, 0] * c_a) / det
+        return np.stack([x, y], axis=1)
 
     def _refine_corners(self, image_buffer: np.ndarray, poly_points: np.ndarray) -> np.ndarray:
         """
         Refines AI points by finding dominant lines near the AI edges 
         and calculating their intersections.
         """
-        # 1. Standardize to grayscale
-        if image_buffer.dtype != np.uint8:
-            gray = (np.clip(image_buffer, 0, 1) * 255).astype(np.uint8)
+        padding = 15 # Reduced slightly for a tighter snap
+
+        # 1. Crop to the AI box plus the mask dilation and blur/Canny apron,
+        # so every pass below touches only the chart region, not the full frame
+        height, width = image_buffer.shape[:2]
+        margin = padding + 8
+        x0 = max(int(np.floor(poly_points[:, 0].min())) - margin, 0)
+        y0 = max(int(np.floor(poly_points[:, 1].min())) - margin, 0)
+        x1 = min(int(np.ceil(poly_points[:, 0].max())) + margin + 1, width)
+        y1 = min(int(np.ceil(poly_points[:, 1].max())) + margin + 1, height)
+        if x1 <= x0 or y1 <= y0:
+            return poly_points
+        roi = image_buffer[y0:y1, x0:x1]
+
+        # 2. Standardize to grayscale. Float input is reduced to one channel
+        # first, so clipping and quantization touch 1/3 of the data.
+        roi_shape = roi.shape[:2]
+        gray = self._scratch("gray", roi_shape)
+        if roi.dtype == np.uint8:
+            if roi.ndim == 3:
+                cv2.cvtColor(roi, cv2.COLOR_RGB2GRAY, dst=gray)
+            else:
+                gray[...] = roi
         else:
-            gray = image_buffer
-        if len(gray.shape) == 3:
-            gray = cv2.cvtColor(gray, cv2.COLOR_RGB2GRAY)
+            if roi.dtype != np.float32:
+                roi = roi.astype(np.float32)
+            gray_f = cv2.cvtColor(roi, cv2.COLOR_RGB2GRAY) if roi.ndim == 3 else roi
+            # Zero negatives (convertScaleAbs takes |x|); values above 1.0
+            # saturate at 255 inside convertScaleAbs, so no upper clip pass
+            _, gray_f = cv2.threshold(gray_f, 0, 0, cv2.THRESH_TOZERO)
+            cv2.convertScaleAbs(gray_f, dst=gray, alpha=255.0)
             
-        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+        blurred = cv2.GaussianBlur(gray, (5, 5), 0, dst=self._scratch("blurred", roi_shape))
 
-        # 2. Mask the search area
-        mask = np.zeros_like(gray)
-        padding = 15 # Reduced slightly for a tighter snap
-        cv2.fillPoly(mask, [poly_points.astype(np.int32)], 255)
-        mask = cv2.dilate(mask, np.ones((padding, padding), np.uint8))
+        # 3. Mask the search area (polygon shifted into ROI coordinates)
+        mask = self._scratch("mask", roi_shape)
+        mask.fill(0)
+        search_poly = self._inflate_polygon(poly_points.astype(np.float64), padding // 2)
+        if search_poly is not None:
+            cv2.fillPoly(mask, [np.rint(search_poly - (x0, y0)).astype(np.int32)], 255)
+        else:
+            # Degenerate AI box: grow the filled polygon with a morphological dilate instead
+            cv2.fillPoly(mask, [(poly_points - (x0, y0)).astype(np.int32)], 255)
+            mask = cv2.dilate(mask, np.ones((padding, padding), np.uint8), dst=self._scratch("search", roi_shape))
         
-        # 3. Detect Edges and Lines
-        edges = cv2.Canny(blurred, 50, 150)
-        masked_edges = cv2.bitwise_and(edges, mask)
+        # 4. Detect Edges and Lines
+        edges = cv2.Canny(blurred, 50, 150, edges=self._scratch("edges", roi_shape))
+        masked_edges = cv2.bitwise_and(edges, mask, dst=edges)
         
-        lines = cv2.HoughLinesP(masked_edges, 1, np.pi/180, threshold=40, minLineLength=40, maxLineGap=10)
+        lines = self._hough_segments(masked_edges, poly_points)
         
         if lines is None:
             return poly_points
 
-        # 4. Group lines 
-        h_lines, v_lines = [], []
-        for line in lines:
-            x1, y1, x2, y2 = line[0]
-            if abs(x2 - x1) > abs(y2 - y1): h_lines.append(line[0])
-            else: v_lines.append(line[0])
+        # Back to full-frame coordinates
+        lines = lines + np.array([x0, y0, x0, y0], dtype=lines.dtype)
+
+        # 5. Group lines (one vectorized pass over the (N, 1, 4) Hough output)
+        segs = lines[:, 0, :]
+        horizontal = np.abs(segs[:, 2] - segs[:, 0]) > np.abs(segs[:, 3] - segs[:, 1])
+        h_lines, v_lines = segs[horizontal], segs[~horizontal]
 
         if len(h_lines) < 2 or len(v_lines) < 2:
             return poly_points
 
         print(f"[DEBUG] Snap active: Found {len(h_lines)}H and {len(v_lines)}V lines.")
 
-        # 5. Proximity Sorting (Select lines closest to AI box boundaries)
+        # 6. Proximity Sorting (Select lines closest to AI box boundaries)
         ai_top = np.min(poly_points[:, 1])
         ai_bot = np.max(poly_points[:, 1])
         ai_left = np.min(poly_points[:, 0])
         ai_right = np.max(poly_points[:, 0])
 
-        top_l = min(h_lines, key=lambda l: abs(((l[1] + l[3]) / 2) - ai_top))
-        bot_l = min(h_lines, key=lambda l: abs(((l[1] + l[3]) / 2) - ai_bot))
-        left_l = min(v_lines, key=lambda l: abs(((l[0] + l[2]) / 2) - ai_left))
-        right_l = min(v_lines, key=lambda l: abs(((l[0] + l[2]) / 2) - ai_right))
+        h_mid = (h_lines[:, 1] + h_lines[:, 3]) * 0.5
+        v_mid = (v_lines[:, 0] + v_lines[:, 2]) * 0.5
+        top_l = h_lines[np.argmin(np.abs(h_mid - ai_top))]
+        bot_l = h_lines[np.argmin(np.abs(h_mid - ai_bot))]
+        left_l = v_lines[np.argmin(np.abs(v_mid - ai_left))]
+        right_l = v_lines[np.argmin(np.abs(v_mid - ai_right))]
 
-        # 6. Intersect the 4 boundary lines
-        tl = self._get_intersection(top_l, left_l)
-        tr = self._get_intersection(top_l, right_l)
-        br = self._get_intersection(bot_l, right_l)
-        bl = self._get_intersection(bot_l, left_l)
+        # 7. Intersect the 4 boundary lines
+        # (tl, tr, br, bl) in one batched solve
+        corners = self._get_intersections(
+            np.stack([top_l, top_l, bot_l, bot_l]),
+            np.stack([left_l, right_l, right_l, left_l])
+        )
 
-        if any(p is None for p in [tl, tr, br, bl]):
+        if corners is None:
             return poly_points
 
-        return np.array([tl, tr, br, bl], dtype=np.float32)
+        return corners.astype(np.float32)
+
+    def _inflate_polygon(self, points: np.ndarray, offset: float) -> np.ndarray:
+        """
+        Pushes every edge of a convex polygon outward by `offset` pixels and
+        re-intersects neighbouring edges (a mitred offset). Filling the result
+        replaces fillPoly + dilate over the whole mask. Returns None if two
+        neighbouring edges are parallel.
+        """
+        nxt = np.roll(points, -1, axis=0)
+        direction = nxt - points
+        normals = np.stack([direction[:, 1], -direction[:, 0]], axis=1)
+        lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+        if np.any(lengths == 0):
+            return None
+        normals /= lengths
+
+        # Flip any normal that points toward the centroid
+        inward = np.einsum('ij,ij->i', normals, (points + nxt) * 0.5 - points.mean(axis=0)) < 0
+        normals[inward] *= -1
+
+        shift = normals * offset
+        edges = np.hstack([points + shift, nxt + shift])
+        # Vertex i is where edge i-1 meets edge i
+        return self._get_intersections(np.roll(edges, 1, axis=0), edges)
+
+    def _hough_segments(self, edges: np.ndarray, poly_points: np.ndarray) -> np.ndarray:
+        """
+        Probabilistic Hough on the OpenCL device (T-API) when one is available,
+        else on the CPU. Returns the (N, 1, 4) segments or None.
+
+        Vote and length limits scale with the AI box diagonal (floored at
+        small-chart values), so large charts stop accumulating short texture
+        segments and small charts still yield their edges. Chart edges are
+        near axis-aligned, so 2-degree angle bins are enough and halve the
+        accumulator.
+        """
+        diag = float(np.linalg.norm(poly_points.max(axis=0) - poly_points.min(axis=0)))
+        hough_args = dict(
+            rho=1, theta=np.pi/90,
+            threshold=max(20, int(diag * 0.05)),
+            minLineLength=max(20, int(diag * 0.1)),
+            maxLineGap=max(5, int(diag * 0.02))
+        )
+        if cv2.ocl.useOpenCL():
+            try:
+                lines = cv2.HoughLinesP(cv2.UMat(edges), **hough_args)
+                if isinstance(lines, cv2.UMat):
+                    lines = lines.get()
+                return lines if lines is not None and len(lines) else None
+            except cv2.error as e:
+                print(f"[WARNING] OpenCL Hough failed, using CPU: {e}")
+        return cv2.HoughLinesP(edges, **hough_args)
 
-    def rectify(self, image_buffer: np.ndarray, corners: np.ndarray) -> np.ndarray:
-        return image_buffer
\ No newline at end of file
+    def _scratch(self, role: str, shape: tuple) -> np.ndarray:
+        """Returns the uint8 working image for `role`, reallocated only when the ROI size changes."""
+        buf = self._scratch_bufs.get(role)
+        if buf is None or buf.shape != shape:
+            buf = np.empty(shape, dtype=np.uint8)
+            self._scratch_bufs[role] = buf
+        return buf
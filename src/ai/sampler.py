@@ -12,7 +12,7 @@ from .locator import ChartLocator
 from .topology import ChartTopology
 from core.models import ColorPatch, AuditResult, AuditStatus
 from core.config import settings
-from ai.utils import prep_for_pil
+from ai.utils import to_uint8
 from core.color_engine import ColorEngine
 
 class PatchSampler:
@@ -28,15 +28,33 @@ class PatchSampler:
         """
         Processes the image and returns a fully populated AuditResult.
         """
-        template = settings.get_current_template()
-
         # --- TEMPORARY TEST SABOTAGE ---
         #test_display = display_buffer * 0.01  # Make the UI view nearly pitch black
         #print("[TEST] Sabotaging display_buffer to simulate a dark LUT...")
 
         # 1. Locate using the Display Buffer
         raw_points, reasoning = self.locator.locate(display_buffer, audit_buffer, manual_corners=manual_corners, use_snap=use_snap)
-        
+        return self._sample_located(display_buffer, audit_buffer, source_path, raw_points, reasoning, manual_corners)
+
+    def sample_all_batch(self, display_buffers: list, audit_buffers: list,
+                         source_paths: list, use_snap: bool = True) -> list[AuditResult]:
+        """
+        Audits several frames, locating all charts through one batched
+        Florence-2 pass. Returns one AuditResult per frame, in input order.
+        """
+        located = self.locator.locate_batch(display_buffers, audit_buffers, use_snap=use_snap)
+        return [
+            self._sample_located(display_buffer, audit_buffer, source_path, raw_points, reasoning)
+            for display_buffer, audit_buffer, source_path, (raw_points, reasoning)
+            in zip(display_buffers, audit_buffers, source_paths, located)
+        ]
+
+    def _sample_located(self, display_buffer: np.ndarray, audit_buffer: np.ndarray,
+                        source_path: str, raw_points: np.ndarray, reasoning: str,
+                        manual_corners: np.ndarray = None) -> AuditResult:
+        """Rectifies and samples a frame whose chart corners are already known."""
+        template = settings.get_current_template()
+
         # Handle Failure Case
         if raw_points is None or len(raw_points) != 4:
             return AuditResult(
@@ -48,7 +66,7 @@ class PatchSampler:
             )
 
         # 2. Rectify BOTH buffers
-        rect_display = self.topology.rectify(display_buffer, raw_points)
+        rect_display = self.topology.rectify(display_buffer, raw_points, preview=True)
         rect_audit = self.topology.rectify(audit_buffer, raw_points)
 
         # 3. Orientation Fix (Apply to both branches)
@@ -60,6 +78,11 @@ class PatchSampler:
             rect_display = flipped_display
             rect_audit = np.rot90(rect_audit, 2)
 
+        # Quantize the display warp only once orientation is settled: a dark
+        # display LUT rounds both 8-bit anchor windows to 0, which reads as a flip
+        if settings.qc_warp_dtype == "uint8":
+            rect_display = to_uint8(np.ascontiguousarray(rect_display))
+
         # 4. Generate sample coordinates & Sample Patches
         sample_coords = self.topology.analyze()
         color_patches = []
@@ -67,48 +90,33 @@ class PatchSampler:
 
         total_contamination_flags = 0
 
+        full_means, variances, edge_drifts = self._patch_statistics(rect_audit, sample_coords, radius)
+
         for i, (y, x) in enumerate(sample_coords):
             target_key = list(template.anchors.keys())[i] if template.topology == "anchored" else i
             target_rgb = template.color_targets.get(target_key, [0.0, 0.0, 0.0])
 
-            # ROI Sampling
-            y_s, y_e = max(0, int(y - radius)), min(rect_audit.shape[0], int(y + radius))
-            x_s, x_e = max(0, int(x - radius)), min(rect_audit.shape[1], int(x + radius))
-            
-            roi = rect_audit[y_s:y_e, x_s:x_e, :]
-            
-            # --- INTEGRITY CHECK: INTERNAL VARIANCE ---
-            # np.std tells us if the pixels are consistent. High std = noise or bezel.
-            pixel_variance = np.mean(np.std(roi, axis=(0, 1)))
-            
-            # --- INTEGRITY CHECK: CORE VS RING ---
-            # Compare inner 50% to full sample. If they differ, we're hitting an edge.
-            h, w, _ = roi.shape
-            core_roi = roi[h//4:-h//4, w//4:-w//4, :]
-            core_mean = np.mean(core_roi, axis=(0, 1))
-            full_mean = np.mean(roi, axis=(0, 1))
-            
-            edge_drift = np.mean(np.abs(core_mean - full_mean))
+            pixel_variance = float(variances[i])
             
             # Contamination logic
-            is_bad = (pixel_variance > settings.integrity_threshold) or (edge_drift > 0.02)
+            is_bad = (pixel_variance > settings.integrity_threshold) or (edge_drifts[i] > 0.02)
             if is_bad: total_contamination_flags += 1
 
             patch = ColorPatch(
                 name=f"Patch_{target_key}", 
-                observed_rgb=full_mean.astype(np.float32),
+                observed_rgb=full_means[i].astype(np.float32),
                 target_rgb=np.array(target_rgb, dtype=np.float32),
                 local_center=(int(x), int(y)),
                 index=i,
                 sample_variance=pixel_variance,
-                is_contaminated=is_bad
+                is_contaminated=bool(is_bad)
             )
             color_patches.append(patch)
 
         # 5. Create the "Audit View" Proof (Optimized)
         qc_image_raw = self.topology.generate_qc_image(rect_display, sample_coords)
-        # Use our new util to get a clean uint8 buffer for the UI
-        qc_image_uint8 = np.array(prep_for_pil(qc_image_raw))
+        # Straight to a contiguous uint8 buffer for the UI; no PIL round-trip
+        qc_image_uint8 = np.ascontiguousarray(to_uint8(qc_image_raw))
 
         # 6. Build and Return the Final AuditResult
         # If manual_corners exists, it's a MANUAL_EDIT. Otherwise, it's COMPLETE.
@@ -129,4 +137,47 @@ class PatchSampler:
             integrity_warning=integrity_score < 1.0,
             analysis_intent=settings.analysis_intent, 
             is_pass=True # Auditor will finalize this based on Delta E and DNA
-        )
\ No newline at end of file
+        )
+
+    def _patch_statistics(self, rect_audit: np.ndarray, sample_coords, radius: int):
+        """
+        Computes the sampling statistics for every patch at once.
+        One integral-image pass turns each window sum into four lookups,
+        instead of slicing and reducing every ROI separately.
+        Returns (full_means (N, 3), pixel_variances (N,), edge_drifts (N,)).
+        """
+        if rect_audit.dtype not in (np.float32, np.float64):
+            rect_audit = rect_audit.astype(np.float32)
+        sums, sq_sums = cv2.integral2(
+            np.ascontiguousarray(rect_audit), sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F
+        )
+        height, width = rect_audit.shape[:2]
+
+        # ROI bounds, truncated like int() so windows match the per-patch slices
+        coords = np.asarray(sample_coords, dtype=np.float64).reshape(-1, 2)
+        y_s = np.maximum(0, (coords[:, 0] - radius).astype(np.int64))
+        y_e = np.minimum(height, (coords[:, 0] + radius).astype(np.int64))
+        x_s = np.maximum(0, (coords[:, 1] - radius).astype(np.int64))
+        x_e = np.minimum(width, (coords[:, 1] + radius).astype(np.int64))
+
+        def window_mean(table, y0, y1, x0, x1):
+            total = table[y1, x1] - table[y0, x1] - table[y1, x0] + table[y0, x0]
+            return total / ((y1 - y0) * (x1 - x0))[:, None]
+
+        full_means = window_mean(sums, y_s, y_e, x_s, x_e)
+
+        # --- INTEGRITY CHECK: INTERNAL VARIANCE ---
+        # Per-channel std tells us if the pixels are consistent. High std = noise or bezel.
+        variance = window_mean(sq_sums, y_s, y_e, x_s, x_e) - full_means ** 2
+        pixel_variances = np.sqrt(np.maximum(variance, 0.0)).mean(axis=1)
+
+        # --- INTEGRITY CHECK: CORE VS RING ---
+        # Compare inner 50% to full sample. If they differ, we're hitting an edge.
+        quarter_h = (y_e - y_s) // 4
+        quarter_w = (x_e - x_s) // 4
+        core_means = window_mean(
+            sums, y_s + quarter_h, y_e - quarter_h, x_s + quarter_w, x_e - quarter_w
+        )
+        edge_drifts = np.abs(core_means - full_means).mean(axis=1)
+
+        return full_means, pixel_variances, edge_drifts
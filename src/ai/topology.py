@@ -11,16 +11,66 @@ Output: A list of (y, x) local coordinates representing the
 calculated patch centers on the rectified image.
 """
 
+from functools import lru_cache
+
 import numpy as np
 import cv2
 from core.config import settings
-from .utils import prep_for_pil # Keep for PIL-based exports later
+from .utils import prep_for_pil, to_uint8 # Keep prep_for_pil for PIL-based exports later
+
+@lru_cache(maxsize=64)
+def _perspective_matrix(corner_bytes: bytes, target_w: int, target_h: int) -> np.ndarray:
+    """
+    Homography from the 4 float32 corners (packed as bytes, so the key is
+    exact) onto the target rectangle. Cached because both the display and
+    audit buffers of a frame, and repeated manual-corner takes, share it.
+    """
+    corners = np.frombuffer(corner_bytes, dtype=np.float32).reshape(4, 2)
+    dst_pts = np.array([
+        [0, 0],
+        [target_w - 1, 0],
+        [target_w - 1, target_h - 1],
+        [0, target_h - 1]
+    ], dtype=np.float32)
+    matrix = cv2.getPerspectiveTransform(corners, dst_pts)
+    matrix.setflags(write=False)
+    return matrix
+
+@lru_cache(maxsize=32)
+def _grid_points(cols: int, rows: int, rect_w: int, rect_h: int, margin: float) -> tuple:
+    """Row-major (y, x) patch centers of a cols x rows grid inside the safety margin."""
+    # 1. Calculate pixel-based margins from the template's percentage
+    margin_x = rect_w * margin
+    margin_y = rect_h * margin
+
+    # 2. Divide the SAFE area by the number of patches
+    cell_w = (rect_w - (2 * margin_x)) / cols
+    cell_h = (rect_h - (2 * margin_y)) / rows
+
+    # 3. Start from the margin, then add the cell center offset
+    center_x = margin_x + (np.arange(cols) * cell_w) + (cell_w / 2)
+    center_y = margin_y + (np.arange(rows) * cell_h) + (cell_h / 2)
+    yy, xx = np.meshgrid(center_y, center_x, indexing='ij')
+    points = np.stack([yy, xx], axis=-1).reshape(-1, 2).astype(np.int64)
+    return tuple(map(tuple, points.tolist()))
+
+@lru_cache(maxsize=32)
+def _anchor_points(positions: tuple, rect_w: int, rect_h: int) -> tuple:
+    """(y, x) centers of normalized (u, v) anchor positions."""
+    uv = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+    points = np.stack([uv[:, 1] * rect_h, uv[:, 0] * rect_w], axis=1).astype(np.int64)
+    return tuple(map(tuple, points.tolist()))
 
 class ChartTopology:
     def __init__(self):
         pass
 
-    def rectify(self, image_buffer: np.ndarray, corners: np.ndarray) -> np.ndarray:
+    def rectify(self, image_buffer: np.ndarray, corners: np.ndarray, preview: bool = False) -> np.ndarray:
+        """
+        Warps the chart to the template's rectified size, keeping the input's
+        precision. preview=True marks the display/QC branch, which replicates
+        the edge instead of filling out-of-frame corners with black.
+        """
         template = settings.get_current_template()
         rect_w, rect_h = template.rectified_size
 
@@ -36,15 +86,15 @@ class ChartTopology:
         else:
             target_w, target_h = rect_w, rect_h
 
-        dst_pts = np.array([
-            [0, 0],
-            [target_w - 1, 0],
-            [target_w - 1, target_h - 1],
-            [0, target_h - 1]
-        ], dtype=np.float32)
+        # The preview never needs the black fill of out-of-frame corners
+        border_mode = cv2.BORDER_REPLICATE if preview else cv2.BORDER_CONSTANT
 
-        matrix = cv2.getPerspectiveTransform(corners.astype(np.float32), dst_pts)
-        rectified = cv2.warpPerspective(image_buffer, matrix, (target_w, target_h))
+        corner_bytes = np.ascontiguousarray(corners, dtype=np.float32).tobytes()
+        matrix = _perspective_matrix(corner_bytes, target_w, target_h)
+        rectified = cv2.warpPerspective(
+            image_buffer, matrix, (target_w, target_h),
+            flags=cv2.INTER_LINEAR, borderMode=border_mode
+        )
 
         if is_portrait:
             print("[DEBUG] Rotating Portrait buffer -90deg to Landscape standard.")
@@ -93,44 +143,21 @@ class ChartTopology:
         """
         template = settings.get_current_template()
         
-        # 1. Fetch template-specific dimensions and margin
+        # Fetch template-specific dimensions and margin
         rect_w, rect_h = template.rectified_size
-        margin = template.inset_margin
-
-        points = []
-        
-        # 2. Calculate pixel-based margins from the template's percentage
-        margin_x = rect_w * margin 
-        margin_y = rect_h * margin
-        
-        # 3. Define the "Working Area" inside the safety margin
-        safe_w = rect_w - (2 * margin_x)
-        safe_h = rect_h - (2 * margin_y)
 
+        # Both layouts depend only on template geometry, so they are memoized
         # GRID TOPOLOGY (Macbeth, etc.)
         if template.topology == "grid":
             cols, rows = template.grid
-            
-            # Divide the SAFE area by the number of patches
-            cell_w = safe_w / cols
-            cell_h = safe_h / rows
-
-            for r in range(rows):
-                for c in range(cols):
-                    # Start from the margin, then add the cell center offset
-                    center_x = margin_x + (c * cell_w) + (cell_w / 2)
-                    center_y = margin_y + (r * cell_h) + (cell_h / 2)
-                    points.append((int(center_y), int(center_x)))
+            return list(_grid_points(cols, rows, rect_w, rect_h, template.inset_margin))
         
         # ANCHORED TOPOLOGY (Kodak, etc.)
-        elif template.topology == "anchored":
-            for anchor_id, data in template.anchors.items():
-                u, v = data["pos"]
-                center_x = u * rect_w
-                center_y = v * rect_h
-                points.append((int(center_y), int(center_x)))
+        if template.topology == "anchored":
+            positions = tuple(tuple(data["pos"]) for data in template.anchors.values())
+            return list(_anchor_points(positions, rect_w, rect_h))
 
-        return points
+        return []
 
     def generate_qc_image(self, rectified_image: np.ndarray, corners: np.ndarray = None, patch_results: list = None) -> np.ndarray:
         """
@@ -138,9 +165,10 @@ class ChartTopology:
         - If corners are provided: draws the boundary box.
         - If patch_results are provided: draws the Pass/Fail grid.
         """
-        # Ensure we are working with a uint8 sRGB-style copy for the UI
+        # Ensure we are working with a uint8 sRGB-style copy for the UI.
+        # to_uint8 already returns a fresh buffer for float input (one OpenCV pass).
         if rectified_image.dtype != np.uint8:
-            qc_img = (np.clip(rectified_image, 0, 1) * 255).astype(np.uint8)
+            qc_img = to_uint8(np.ascontiguousarray(rectified_image))
         else:
             qc_img = rectified_image.copy()
 
@@ -154,15 +182,21 @@ class ChartTopology:
         if patch_results:
             template = settings.get_current_template()
             radius = template.sample_size // 2
-            
-            for patch in patch_results:
-                y, x = patch.local_center
-                # Pass/Fail color logic
-                color = (0, 255, 0) if patch.delta_e <= settings.tolerance_threshold else (0, 0, 255) # BGR
-                
-                # Draw square
-                cv2.rectangle(qc_img, (x-radius, y-radius), (x+radius, y+radius), color, 1)
-                # Draw small center dot
-                cv2.circle(qc_img, (x, y), 2, color, -1)
+
+            # local_center is (x, y) (see ColorPatch / PatchSampler), as OpenCV expects
+            centers = np.array([patch.local_center for patch in patch_results], dtype=np.int32)
+            passed = np.array([patch.delta_e <= settings.tolerance_threshold for patch in patch_results])
+            square = np.array([[-radius, -radius], [radius, -radius], [radius, radius], [-radius, radius]], dtype=np.int32)
+
+            # One polylines call per Pass/Fail color instead of two draw calls per patch
+            for is_pass, color in ((passed, (0, 255, 0)), (~passed, (0, 0, 255))): # BGR
+                if not is_pass.any():
+                    continue
+                pts = centers[is_pass]
+                # Draw squares
+                cv2.polylines(qc_img, list(pts[:, None, :] + square), True, color, 1)
+                # Draw small center dots: a zero-length 4px segment rasterizes
+                # to the same disc as cv2.circle(radius=2, filled)
+                cv2.polylines(qc_img, list(np.repeat(pts[:, None, :], 2, axis=1)), False, color, 4)
 
         return qc_img
\ No newline at end of file
@@ -5,6 +5,7 @@ Handles the conversion between high-precision float buffers (0-1)
 and the integer-based formats (uint8) required by Pillow and Florence-2.
 """
 
+import cv2
 import numpy as np
 from PIL import Image
 
@@ -13,35 +14,71 @@ def prep_for_pil(buffer: np.ndarray) -> Image.Image:
     Optimized conversion from float32/float16 buffers to uint8 PIL Images.
     Used for high-frequency UI previews and AI detection.
     """
-    # 1. Fast Path: If already uint8 (0-255), just wrap it as a PIL image
+    return Image.fromarray(to_uint8(buffer))
+
+def to_uint8(buffer: np.ndarray) -> np.ndarray:
+    """
+    Converts a 0-1 float buffer to uint8 (0-255) without the full-size
+    float temporaries of np.clip(...) * 255. OpenCV's SIMD paths clamp
+    negatives to zero, then scale, round and saturate in a single pass.
+    """
+    # 1. Fast Path: already uint8 (0-255)
     if buffer.dtype == np.uint8:
-        return Image.fromarray(buffer)
-    
-    # 2. Performance Path: 
-    # Multiply and cast in a single expression to minimize intermediate copies.
-    # We use 255.0 to maintain precision before the integer floor.
-    img_data = (np.clip(buffer, 0, 1) * 255.0).astype(np.uint8)
-    
-    return Image.fromarray(img_data)
-
-def normalize_for_ai(buffer: np.ndarray) -> np.ndarray:
+        return buffer
+
+    # 2. OpenCV has no float16 kernels; NumPy handles the rare half buffers
+    if buffer.dtype not in (np.float32, np.float64):
+        return np.rint(np.clip(buffer, 0, 1) * 255.0).astype(np.uint8)
+
+    # convertScaleAbs takes |x|, so negatives must be zeroed first
+    _, non_negative = cv2.threshold(buffer, 0, 0, cv2.THRESH_TOZERO)
+    return cv2.convertScaleAbs(non_negative, alpha=255.0)
+
+def _histogram_percentiles(buffer: np.ndarray, quantiles, bins: int = 1024) -> list[float]:
     """
-    Standardizes a buffer for AI feature detection.
-    Stretches contrast based on image percentiles to aid detection in 
-    underexposed or log-encoded images.
+    Matches np.percentile (linear interpolation) without partitioning the
+    whole buffer. One SIMD histogram pass brackets each required order
+    statistic to a single bin; only the values inside that bin are then
+    partitioned, so the result is exact however far hot pixels stretch the
+    range. Small buffers go straight to np.percentile.
     """
-    # Use a slightly faster approximation or keep percentiles for accuracy
-    # 2nd and 98th percentile helps ignore hot pixels/noise
-    p2, p98 = np.percentile(buffer, (2, 98))
-    
-    span = p98 - p2
-    if span < 1e-5:
-        return np.clip(buffer, 0, 1)
-        
-    # In-place math to save memory
-    normalized = buffer - p2
-    normalized /= span
-    return np.clip(normalized, 0, 1)
+    values = np.ascontiguousarray(buffer, dtype=np.float32).ravel()
+    if values.size <= bins * 4:
+        return [float(v) for v in np.percentile(values, np.multiply(quantiles, 100.0))]
+
+    lo, hi = cv2.minMaxLoc(values.reshape(-1, 1))[:2]
+    if hi <= lo:
+        return [lo] * len(quantiles)
+
+    # calcHist's top edge is exclusive, so the maximum lands past the last bin
+    cdf = np.cumsum(cv2.calcHist([values.reshape(-1, 1)], [0], None, [bins], [lo, hi]).ravel())
+    width = (hi - lo) / bins
+
+    def order_statistic(k: int) -> float:
+        idx = int(np.searchsorted(cdf, k, side='right'))
+        if idx >= bins:
+            return hi
+        # Re-count with NumPy's own comparisons so float edge rounding in
+        # calcHist can't shift the bracket by one value
+        edge_lo, edge_hi = lo + idx * width, lo + (idx + 1) * width
+        below = int(np.count_nonzero(values < edge_lo))
+        in_bin = values[(values >= edge_lo) & (values < edge_hi)]
+        if not below <= k < below + in_bin.size:
+            return float(np.partition(values, k)[k])
+        return float(np.partition(in_bin, k - below)[k - below])
+
+    results = []
+    for q in quantiles:
+        rank = q * (values.size - 1)
+        k = int(np.floor(rank))
+        low = order_statistic(k)
+        frac = rank - k
+        if frac == 0.0:
+            results.append(low)
+        else:
+            high = order_statistic(k + 1)
+            results.append(low + frac * (high - low))
+    return results
 
 def get_bytes_size(buffer: np.ndarray) -> str:
     """Utility to track memory usage of EXR buffers in the session."""
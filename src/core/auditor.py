@@ -5,21 +5,65 @@ Standardized to template-based targets and ACEScg workflow.
 
 import numpy as np
 import colour
+from colour.difference import delta_E_CIE2000
 from core.models import ColorPatch, AuditResult
 from core.config import settings
 from core.templates import CHART_LIBRARY
+from collections import OrderedDict
 from datetime import datetime
+from functools import lru_cache
+from typing import Optional
+
+# Rec.709 luminance weights, float32 like the rest of the audit math
+REC709_LUMA = np.array([0.2126, 0.7152, 0.0722], dtype=np.float32)
+
+@lru_cache(maxsize=16)
+def _target_lab(target_bytes: bytes, patch_count: int) -> np.ndarray:
+    """
+    ACEScg -> Lab for a chart's (N, 3) float32 reference values, packed as
+    bytes so the key is exact. Targets are fixed per template, so every
+    frame audited against the same chart reuses one conversion.
+    """
+    target_rgb = np.frombuffer(target_bytes, dtype=np.float32).reshape(patch_count, 3)
+    lab = colour.XYZ_to_Lab(colour.RGB_to_XYZ(target_rgb, 'ACEScg'))
+    lab.setflags(write=False)
+    return lab
+
+# Recent (observed, target) patch sets whose Delta E is kept by each Auditor
+DE_MEMO_SIZE = 16
 
 class Auditor:
     def __init__(self):
-        pass
+        # Re-auditing identical patch data (same file, spaces and corners) reuses its dE
+        self._de_memo: OrderedDict[tuple[bytes, bytes], np.ndarray] = OrderedDict()
 
     def calculate_delta_e(self, observed_rgb: np.ndarray, target_rgb: np.ndarray) -> float:
         """Calculates Delta E 2000 in the Audit Space (ACEScg)."""
-        if np.all(target_rgb <= 0): return 0.0
+        return float(self.calculate_delta_e_batch(np.atleast_2d(observed_rgb), np.atleast_2d(target_rgb))[0])
+
+    def calculate_delta_e_batch(self, observed_rgb: np.ndarray, target_rgb: np.ndarray) -> np.ndarray:
+        """
+        Delta E 2000 for (N, 3) ACEScg arrays in a single colour-science call.
+        Rows whose target is all <= 0 (no reference value) score 0.0.
+        """
+        observed_rgb = np.ascontiguousarray(observed_rgb, dtype=np.float32)
+        target_rgb = np.ascontiguousarray(target_rgb, dtype=np.float32)
+        key = (observed_rgb.tobytes(), target_rgb.tobytes())
+        de = self._de_memo.get(key)
+        if de is not None:
+            self._de_memo.move_to_end(key)
+            return de
+
         obs_lab = colour.XYZ_to_Lab(colour.RGB_to_XYZ(observed_rgb, 'ACEScg'))
-        targ_lab = colour.XYZ_to_Lab(colour.RGB_to_XYZ(target_rgb, 'ACEScg'))
-        return float(colour.delta_E(obs_lab, targ_lab, method='CIE 2000'))
+        targ_lab = _target_lab(key[1], len(target_rgb))
+        de = np.asarray(delta_E_CIE2000(obs_lab, targ_lab), dtype=np.float32)
+        de[target_rgb.max(axis=1) <= 0] = 0.0
+        de.setflags(write=False)
+
+        self._de_memo[key] = de
+        if len(self._de_memo) > DE_MEMO_SIZE:
+            self._de_memo.popitem(last=False)
+        return de
 
     def calculate_cdl_correction(self, audit_result: AuditResult) -> AuditResult:
         """
@@ -35,24 +79,22 @@ class Auditor:
 
         mode = getattr(template, 'analysis_mode', 'gain')
 
-        # Map the patches for easy lookup
-        patch_map = {p.name.replace("Patch_", "").strip().lower(): p for p in audit_result.patches}
-        index_map = {p.index: p for p in audit_result.patches}
-
         if mode == "gain":
             return self._solve_gain(audit_result)
         
         elif mode == "anchors":
             # Tier 2: Kodak - Uses B, G, W for a robust linear fit
+            # Map the patches by name for easy lookup
+            patch_map = {p.name.replace("Patch_", "").strip().lower(): p for p in audit_result.patches}
             return self._solve_anchors(audit_result, patch_map)
         
         elif mode == "ramp":
             # Tier 3: Grayscale Ramp - Linear fit through sequence
-            return self._solve_ramp(audit_result, index_map, template.neutral_indices)
+            return self._solve_ramp(audit_result, template.neutral_index_array)
             
         elif mode == "color":
             # Tier 4: Macbeth - CDL + placeholder for Matrix
-            return self._solve_color(audit_result, index_map, template.neutral_indices)
+            return self._solve_color(audit_result, template.neutral_index_array)
 
         print("WARNING: No mode matched. Returning identity.") 
         return audit_result
@@ -63,18 +105,38 @@ class Auditor:
             return targ, obs  # Mapping Target -> Observed (How was this grade made?)
         return obs, targ      # Mapping Observed -> Target (How do I fix this?)
 
+    def _fit_linear(self, x_data: np.ndarray, y_data: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Per-channel least-squares line y = m * x + c for (N, 3) data, solved
+        in closed form for all three channels at once (same fit as a
+        degree-1 polyfit per channel). A channel with no spread in x falls
+        back to a pure gain through the origin.
+        """
+        x = np.asarray(x_data, dtype=np.float32)
+        y = np.asarray(y_data, dtype=np.float32)
+        x_mean = x.mean(axis=0)
+        y_mean = y.mean(axis=0)
+        dx = x - x_mean
+        var = np.einsum('ij,ij->j', dx, dx)
+        cov = np.einsum('ij,ij->j', dx, y - y_mean)
+
+        flat = var <= 0
+        slopes = np.where(flat, y_mean / np.where(x_mean != 0, x_mean, 1.0), cov / np.where(flat, 1.0, var))
+        offsets = np.where(flat, 0.0, y_mean - slopes * x_mean)
+        return slopes.astype(np.float32, copy=False), offsets.astype(np.float32, copy=False)
+
     def _solve_gain(self, result: AuditResult) -> AuditResult:
         """TIER 1: Single patch balance."""
         if not result.patches: return result
         
-        obs = result.patches[0].observed_rgb
-        targ = result.patches[0].target_rgb
+        all_obs, all_targ, _ = result.rgb_arrays()
+        obs, targ = all_obs[0], all_targ[0]
         
         # Apply intent swap
         x, y = self._get_regression_data(obs, targ, result.analysis_intent)
         
         # Slope = Y / X (with epsilon to avoid division by zero)
-        result.slope = np.clip(y / (x + 1e-6), 0.0, 4.0).astype(np.float32)
+        result.slope = np.clip(y / (x + 1e-6), 0.0, 4.0, dtype=np.float32)
         result.offset = np.zeros(3, dtype=np.float32)
         result.power = np.ones(3, dtype=np.float32)
         
@@ -96,46 +158,52 @@ class Auditor:
         if len(obs_list) < 2: return result
 
         # Apply intent swap to the arrays
-        x_data, y_data = self._get_regression_data(np.array(obs_list), np.array(targ_list), result.analysis_intent)
+        x_data, y_data = self._get_regression_data(
+            np.asarray(obs_list, dtype=np.float32), np.asarray(targ_list, dtype=np.float32), result.analysis_intent)
 
-        slopes, offsets = [], []
-        for i in range(3):
-            m, c = np.polyfit(x_data[:, i], y_data[:, i], 1)
-            slopes.append(m)
-            offsets.append(c)
+        slopes, offsets = self._fit_linear(x_data, y_data)
 
-        result.slope = np.clip(slopes, 0.0, 4.0).astype(np.float32)
-        result.offset = np.clip(offsets, -1.0, 1.0).astype(np.float32)
+        result.slope = np.clip(slopes, 0.0, 4.0, dtype=np.float32)
+        result.offset = np.clip(offsets, -1.0, 1.0, dtype=np.float32)
         return result
 
-    def _solve_ramp(self, result: AuditResult, index_map: dict, neutral_indices: list) -> AuditResult:
+    def _gather_by_index(self, result: AuditResult, indices: Optional[np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Gathers observed/target rows for the given patch indices (a template's
+        int32 neutral_index_array), in that order, from the stacked patch
+        arrays. Missing indices are skipped and the last patch wins on
+        duplicate indices.
+        """
+        obs, targ, patch_idx = result.rgb_arrays()
+        if indices is None:
+            return obs[:0], targ[:0]
+        wanted = np.asarray(indices, dtype=np.int32)
+        if not len(patch_idx) or not len(wanted):
+            return obs[:0], targ[:0]
+        hits = patch_idx[::-1, None] == wanted[None, :]
+        rows = len(patch_idx) - 1 - hits.argmax(axis=0)
+        rows = rows[hits.any(axis=0)]
+        return obs[rows], targ[rows]
+
+    def _solve_ramp(self, result: AuditResult, neutral_indices: Optional[np.ndarray]) -> AuditResult:
         """TIER 3/4: Macbeth/Ramp Style. Regression fit through multiple points."""
-        obs_list, targ_list = [], []
-        for idx in neutral_indices:
-            p = index_map.get(idx)
-            if p:
-                obs_list.append(p.observed_rgb)
-                targ_list.append(p.target_rgb)
+        obs, targ = self._gather_by_index(result, neutral_indices)
 
-        if len(obs_list) < 2: return result
+        if len(obs) < 2: return result
 
         # Apply intent swap
-        x_data, y_data = self._get_regression_data(np.array(obs_list), np.array(targ_list), result.analysis_intent)
+        x_data, y_data = self._get_regression_data(obs, targ, result.analysis_intent)
 
-        slopes, offsets = [], []
-        for i in range(3):
-            m, c = np.polyfit(x_data[:, i], y_data[:, i], 1)
-            slopes.append(m)
-            offsets.append(c)
+        slopes, offsets = self._fit_linear(x_data, y_data)
 
-        result.slope = np.clip(slopes, 0.0, 4.0).astype(np.float32)
-        result.offset = np.clip(offsets, -1.0, 1.0).astype(np.float32)
+        result.slope = np.clip(slopes, 0.0, 4.0, dtype=np.float32)
+        result.offset = np.clip(offsets, -1.0, 1.0, dtype=np.float32)
         return result
     
-    def _solve_color(self, result: AuditResult, index_map: dict, neutral_indices: list) -> AuditResult:
+    def _solve_color(self, result: AuditResult, neutral_indices: Optional[np.ndarray]) -> AuditResult:
         """TIER 4: Macbeth. Neutralization CDL + Matrix Profiling."""
         # 1. First, solve the 1D neutralization (Slope/Offset)
-        result = self._solve_ramp(result, index_map, neutral_indices)
+        result = self._solve_ramp(result, neutral_indices)
         
         # 2. Then, solve the 3x3 Color Matrix
         result = self._solve_3x3_matrix(result)
@@ -148,23 +216,17 @@ class Auditor:
         Solves for a 3x3 matrix using the 18 color patches.
         """
         # 1. Gather color patches (Indices 0-17 on a Macbeth 24)
-        obs_list = []
-        targ_list = []
-        
         # We only use color patches for the matrix to avoid skewing the neutrals
-        for p in result.patches:
-            if p.index < 18:
-                obs_list.append(p.observed_rgb)
-                targ_list.append(p.target_rgb)
+        all_obs, all_targ, patch_idx = result.rgb_arrays()
+        is_color = patch_idx < 18
+        obs = all_obs[is_color]
+        targ = all_targ[is_color]
         
-        if len(obs_list) < 3:
+        if len(obs) < 3:
             return result # Need at least 3 colors to solve a 3x3
 
         # 2. Prepare Data
         # We use the same intent logic as the CDL
-        obs = np.array(obs_list)
-        targ = np.array(targ_list)
-        
         x_data, y_data = self._get_regression_data(obs, targ, result.analysis_intent)
 
         # 3. Solve for Matrix M using Linear Least Squares
@@ -177,23 +239,17 @@ class Auditor:
         result.matrix_3x3 = matrix.astype(np.float32)
 
         # --- New: Calculate Residual Delta E ---
-        # Apply the matrix to all color patches to see how well it worked
-        errors = []
-        for p in result.patches:
-            if p.index < 18: # Only check color patches
-                # Apply matrix: [1x3] * [3x3] = [1x3]
-                corrected_rgb = np.dot(p.observed_rgb, result.matrix_3x3)
-                
-                # Simple Euclidean Distance (Delta E approximation in Linear Space)
-                # For high-accuracy, we would convert to Lab, but this is 
-                # excellent for relative "Post-Matrix" validation.
-                diff = corrected_rgb - p.target_rgb
-                de = np.sqrt(np.sum(diff**2))
-                errors.append(de)
-
-        if errors:
-            result.delta_e_mean = float(np.mean(errors))
-            result.delta_e_max = float(np.max(errors))
+        # Apply the matrix to all color patches to see how well it worked:
+        # [Nx3] * [3x3] = [Nx3]
+        corrected_rgb = obs @ result.matrix_3x3
+        
+        # Simple Euclidean Distance (Delta E approximation in Linear Space)
+        # For high-accuracy, we would convert to Lab, but this is 
+        # excellent for relative "Post-Matrix" validation.
+        errors = np.linalg.norm(corrected_rgb - targ, axis=1)
+
+        result.delta_e_mean = float(errors.mean())
+        result.delta_e_max = float(errors.max())
         
         return result
 
@@ -204,18 +260,15 @@ class Auditor:
         dna_valid = self.verify_dna(audit_result)
         # --------------------------------
 
-        total_de = 0.0
-        max_de = 0.0
+        # One batched dE call for every patch instead of one per patch
+        obs, targ, _ = audit_result.rgb_arrays()
+        de = self.calculate_delta_e_batch(obs, targ)
 
-        for patch in audit_result.patches:
-            de = self.calculate_delta_e(patch.observed_rgb, patch.target_rgb)
-            patch.delta_e = de 
-            total_de += de
-            max_de = max(max_de, de)
+        for patch, patch_de in zip(audit_result.patches, de.tolist()):
+            patch.delta_e = patch_de
 
-        count = len(audit_result.patches)
-        audit_result.delta_e_mean = total_de / count if count > 0 else 0.0
-        audit_result.delta_e_max = max_de
+        audit_result.delta_e_mean = float(de.mean())
+        audit_result.delta_e_max = float(de.max())
         # Audit passes ONLY if Delta E is low AND the DNA check passed
         audit_result.is_pass = (audit_result.delta_e_mean <= settings.tolerance_threshold) and dna_valid
         
@@ -236,15 +289,16 @@ class Auditor:
             result.ai_reasoning += " | CRITICAL: No neutral patches found."
             return False
         
-        lums = [np.dot(p.observed_rgb, [0.2126, 0.7152, 0.0722]) for p in neutrals]
+        rgbs = np.asarray([p.observed_rgb for p in neutrals], dtype=np.float32)
+        lums = rgbs @ REC709_LUMA
         
         # 1. Monotonicity (The Direction)
-        is_monotonic = all(x >= (y - 0.005) for x, y in zip(lums, lums[1:]))
+        is_monotonic = bool(np.all(lums[:-1] >= lums[1:] - 0.005))
         
         # 2. Dynamic Range (The Magnitude)
         # A real Macbeth white-to-black ramp drops by roughly 2.0 stops or more.
         # We expect a minimum luminance spread of at least 0.1 in ACEScg.
-        total_range = max(lums) - min(lums)
+        total_range = float(np.ptp(lums))
         is_dynamic = total_range > 0.1 
 
         if not is_monotonic:
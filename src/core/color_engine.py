@@ -3,13 +3,49 @@ Precision Color Auditor - OpenColorIO Management & Transformation
 Manages the OCIO v2.x lifecycle and enforces linear-only audit spaces.
 """
 
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
 import PyOpenColorIO as OCIO
 import numpy as np
 from core.config import settings
 
+# Target bytes per row strip, sized so a strip stays resident in L2
+STRIP_BYTES = 256 * 1024
+
+# Integer pixel types OCIO can read natively
+INTEGER_BIT_DEPTHS = {
+    np.dtype(np.uint8): OCIO.BIT_DEPTH_UINT8,
+    np.dtype(np.uint16): OCIO.BIT_DEPTH_UINT16,
+}
+
+# One process-wide strip worker pool shared by every ColorEngine, created
+# on first use (None on single-CPU hosts, where strips run inline)
+_strip_pool: Optional[ThreadPoolExecutor] = None
+
+def _get_strip_pool() -> Optional[ThreadPoolExecutor]:
+    global _strip_pool
+    workers = os.cpu_count() or 1
+    if _strip_pool is None and workers > 1:
+        # OCIO releases the GIL inside apply(), so row strips run in parallel
+        _strip_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocio-strip")
+    return _strip_pool
+
+def _packed_desc(buf: np.ndarray, chans: int, bit_depth: 'OCIO.BitDepth') -> 'OCIO.PackedImageDesc':
+    """Packed OCIO Image Descriptor over a C-contiguous (H, W[, C]) buffer of the given bit depth."""
+    h, w = buf.shape[:2]
+    item = buf.itemsize
+    return OCIO.PackedImageDesc(buf, w, h, chans, bit_depth, item, item * chans, item * chans * w)
+
 class ColorEngine:
     def __init__(self):
         self.config = None
+        # CPU processors keyed by (input_space, output_space, input bit depth); reset with the config
+        self._cpu_proc_cache: dict[tuple, tuple[bool, OCIO.CPUProcessor]] = {}
+        # Colour space lists are fixed for a given config; built on first use
+        self._input_spaces_cache: Optional[list[str]] = None
+        self._linear_spaces_cache: Optional[list[str]] = None
         self.initialize_config()
 
     def initialize_config(self):
@@ -18,6 +54,9 @@ class ColorEngine:
         try:
             self.config = OCIO.Config.CreateFromFile(config_path)
             OCIO.SetCurrentConfig(self.config)
+            self._cpu_proc_cache.clear()
+            self._input_spaces_cache = None
+            self._linear_spaces_cache = None
         except Exception as e:
             raise RuntimeError(f"Failed to load OCIO config at {config_path}: {e}")
 
@@ -25,25 +64,33 @@ class ColorEngine:
         """Returns all available color spaces for the source selection."""
         if not self.config:
             return []
-        return [space.getName() for space in self.config.getColorSpaces()]
+        if self._input_spaces_cache is None:
+            self._input_spaces_cache = [space.getName() for space in self.config.getColorSpaces()]
+        return list(self._input_spaces_cache)
 
     def get_linear_audit_spaces(self) -> list[str]:
         """Returns only Linear spaces. Used primarily for background validation."""
         if not self.config:
             return []
-        
+        if self._linear_spaces_cache is None:
+            self._linear_spaces_cache = self._collect_linear_spaces()
+        return list(self._linear_spaces_cache)
+
+    def _collect_linear_spaces(self) -> list[str]:
+        """Walks the config once, filtering for Linear/ACEScg spaces."""
         linear_spaces = []
         for space in self.config.getColorSpaces():
-            name = space.getName().lower()
+            display_name = space.getName()
+            name = display_name.lower()
             family = space.getFamily().lower()
             
             # Filter logic: Look for 'linear' in the name or family tag
             if "linear" in name or "linear" in family or "acescg" in name:
-                linear_spaces.append(space.getName())
-        
-        # Ensure ACEScg is at the top of the list if it exists
-        if "ACEScg" in linear_spaces:
-            linear_spaces.insert(0, linear_spaces.pop(linear_spaces.index("ACEScg")))
+                # Ensure ACEScg is at the top of the list if it exists
+                if display_name == "ACEScg":
+                    linear_spaces.insert(0, display_name)
+                else:
+                    linear_spaces.append(display_name)
             
         return linear_spaces
 
@@ -90,33 +137,84 @@ class ColorEngine:
     def transform_buffer(self, pixel_buffer: np.ndarray, input_space: str, audit_space: str) -> np.ndarray:
         try:
             h, w = pixel_buffer.shape[:2]
+            chans = pixel_buffer.shape[2] if pixel_buffer.ndim == 3 else 1
 
-            # 1. Normalize and ensure Float32 C-Contiguous
-            data = pixel_buffer.astype(np.float32)
-            if pixel_buffer.dtype == np.uint8:
-                data /= 255.0
-            
-            data = np.ascontiguousarray(data)
-
-            # 2. Get the Processor
-            processor = self.config.getProcessor(input_space, audit_space)
-            cpu = processor.getDefaultCPUProcessor()
+            # 1. Get the (cached) Processor. 8/16-bit buffers are read by OCIO
+            # directly (it normalizes and writes Float32), skipping the upcast pass.
+            in_depth = INTEGER_BIT_DEPTHS.get(pixel_buffer.dtype, OCIO.BIT_DEPTH_F32)
+            is_noop, cpu = self._get_cpu_processor(input_space, audit_space, in_depth)
 
-            # 3. Wrap NumPy array in an OCIO Image Descriptor
-            img_desc = OCIO.PackedImageDesc(data, w, h, 3)
+            if is_noop or in_depth == OCIO.BIT_DEPTH_F32:
+                # 2. Normalize into a single Float32 C-Contiguous working copy
+                data = np.array(pixel_buffer, dtype=np.float32, order='C')
+                if in_depth != OCIO.BIT_DEPTH_F32:
+                    data /= float(np.iinfo(pixel_buffer.dtype).max)
 
-            # 4. Apply the transform IN-PLACE on the 'data' array
-            cpu.apply(img_desc)
+                # 3. Identity transforms (e.g. input == audit space) skip OCIO entirely
+                if not is_noop:
+                    # Apply the transform IN-PLACE on the 'data' array
+                    self._apply_strips(cpu, data, chans)
+            else:
+                # 2-3. Integer source -> fresh Float32 destination in one OCIO pass
+                data = np.empty((h, w, chans), dtype=np.float32)
+                self._apply_strips(cpu, data, chans, src=np.ascontiguousarray(pixel_buffer), src_depth=in_depth)
 
-            # 5. Clip values to 0.0 - 1.0 range for safety
+            # 4. Clip values to 0.0 - 1.0 range for safety
             np.clip(data, 0.0, 1.0, out=data)
 
-            # 6. Return the modified 'data' array, reshaped to (H, W, 3)
-            return data.reshape(h, w, 3)
+            # 5. Return the modified 'data' array, reshaped to (H, W, C)
+            return data.reshape(h, w, chans)
             
         except Exception as e:
             raise RuntimeError(f"OCIO Transform Failed: {e}")
         
+    def _get_cpu_processor(self, input_space: str, output_space: str,
+                           in_depth: 'OCIO.BitDepth' = OCIO.BIT_DEPTH_F32) -> tuple[bool, 'OCIO.CPUProcessor']:
+        """
+        Returns (is_noop, cpu_processor) for a space pair and input bit depth
+        (output is always Float32). Building a processor walks the transform
+        graph and bakes LUTs, so each combination is built once.
+        """
+        key = (input_space, output_space, in_depth)
+        entry = self._cpu_proc_cache.get(key)
+        if entry is None:
+            processor = self.config.getProcessor(input_space, output_space)
+            if in_depth == OCIO.BIT_DEPTH_F32:
+                cpu = processor.getDefaultCPUProcessor()
+            else:
+                cpu = processor.getOptimizedCPUProcessor(in_depth, OCIO.BIT_DEPTH_F32, OCIO.OPTIMIZATION_DEFAULT)
+            entry = (processor.isNoOp(), cpu)
+            self._cpu_proc_cache[key] = entry
+        return entry
+
+    def _apply_strips(self, cpu, data: np.ndarray, chans: int,
+                      src: Optional[np.ndarray] = None, src_depth: 'OCIO.BitDepth' = OCIO.BIT_DEPTH_F32):
+        """
+        Runs the CPU processor over cache-sized row strips of a C-contiguous
+        Float32 buffer, one packed OCIO Image Descriptor per strip (row slices
+        are views, so nothing is copied). In place on 'data', or from an
+        integer 'src' of the same shape into 'data'.
+        """
+        h, w = data.shape[:2]
+        strip_rows = max(16, STRIP_BYTES // (w * chans * data.itemsize))
+
+        def apply_rows(y0: int, y1: int):
+            dst_desc = _packed_desc(data[y0:y1], chans, OCIO.BIT_DEPTH_F32)
+            if src is None:
+                cpu.apply(dst_desc)
+            else:
+                cpu.apply(_packed_desc(src[y0:y1], chans, src_depth), dst_desc)
+
+        pool = _get_strip_pool() if h > strip_rows else None
+        if pool is None:
+            apply_rows(0, h)
+            return
+
+        futures = [pool.submit(apply_rows, y, y + strip_rows) for y in range(0, h, strip_rows)]
+        # Block until every strip is done, surfacing the first OCIO error
+        for f in futures:
+            f.result()
+
     def get_ui_lists(self) -> tuple[list[str], list[str]]:
         """
         Helper for UI population.
@@ -7,11 +7,26 @@ Acts as a central source of truth for all modules.
 import os
 from dataclasses import dataclass, field
 from pathlib import Path
+from types import MappingProxyType
 from typing import Optional, Dict, Tuple
 import numpy as np
 
 from .templates import CHART_LIBRARY, ChartTemplate
 
+def _build_chart_signatures() -> MappingProxyType:
+    """Grid patch count -> read-only chart signature (first template wins on a tie)."""
+    signatures = {}
+    for template in CHART_LIBRARY.values():
+        if template.grid:
+            cols, rows = template.grid
+            signatures.setdefault(cols * rows, MappingProxyType(
+                {"label": template.label, "rows": rows, "cols": cols}
+            ))
+    return MappingProxyType(signatures)
+
+# Templates are constant, so the signature table is built once at import
+_CHART_SIGNATURES = _build_chart_signatures()
+
 @dataclass
 class Settings:
     """
@@ -35,6 +50,15 @@ class Settings:
     # Rectification & Topology Settings
     rectified_size: Tuple[int, int] = (1200, 800) 
     active_chart_type: str = "macbeth_24"
+    # Precision of the rectified display/QC image: "uint8" (quantized right after
+    # the orientation check, which always sees the full-precision warp) or
+    # "float32". The audit buffer is always warped in full precision.
+    qc_warp_dtype: str = "uint8"
+
+    # Camera RAW decode quality: "final" (full-res AHD demosaic) or "draft"
+    # (half-size, linear demosaic; ~4x fewer pixels, fine for patch means).
+    # Draft changes the image size, so corners saved at one quality don't fit the other.
+    ingest_quality: str = "final"
 
     # Directory Management
     output_dir: Path = field(init=False)
@@ -49,6 +73,22 @@ class Settings:
     # Values above this suggest the sample box hit a bezel or border.
     integrity_threshold: float = 0.05
 
+    # AI Detector Performance
+    # Compiles the Florence-2 submodules with torch.compile (CUDA only).
+    # Opt-in until the compiled decoder is validated under generate().
+    compile_detector: bool = False
+    # Greedy decoding by default; raise to 3 to opt back into beam search on hard images.
+    detection_beams: int = 1
+    # Decoding stops once this many <loc_N> tokens are emitted (4 = one box).
+    detection_loc_tokens: int = 4
+    # NF4 weight-only quantization of the Florence-2 decoder (CUDA + bitsandbytes).
+    use_quantized_detector: bool = False
+    # Per-user cache for derived model checkpoints (e.g. the NF4 decoder),
+    # next to the Hugging Face download cache rather than in the source tree.
+    detector_cache_dir: Path = field(init=False)
+    # Keeps the vision tower in host RAM between calls, freeing VRAM for the decoder (CUDA only).
+    detector_offload_encoder: bool = False
+
     def __post_init__(self):
         """Initialize dynamic paths and ensure directories exist."""
         self.default_ocio_path = self.app_root / "src" / "resources" / "ocio" / "config.ocio"
@@ -57,10 +97,13 @@ class Settings:
         # Paths for Official Outputs & Logs
         self.output_dir = self.app_root / "exports"
         self.session_logs_dir = self.app_root / "logs"
+        hf_home = os.environ.get("HF_HOME", Path.home() / ".cache" / "huggingface")
+        self.detector_cache_dir = Path(hf_home) / "precision-color-auditor"
         
-        # Ensure all required directories exist
+        # Ensure all required directories exist (a stat is cheaper than mkdir on EEXIST)
         for d in [self.output_dir, self.session_logs_dir]:
-            d.mkdir(parents=True, exist_ok=True)
+            if not os.path.isdir(d):
+                d.mkdir(parents=True, exist_ok=True)
 
     def get_current_template(self) -> ChartTemplate:
         """Returns the active ChartTemplate object."""
@@ -75,12 +118,7 @@ class Settings:
             raise FileNotFoundError(f"Invalid OCIO config path: {custom_path}")
     
     def get_signature(self, patch_count: int):
-        for key, template in CHART_LIBRARY.items():
-            if template.grid:
-                total = template.grid[0] * template.grid[1]
-                if total == patch_count:
-                    return {"label": template.label, "rows": template.grid[1], "cols": template.grid[0]}
-        return None
+        return _CHART_SIGNATURES.get(patch_count)
 
 # Global Singleton Instance
 settings = Settings()
\ No newline at end of file
@@ -11,20 +11,57 @@ import cv2
 import rawpy
 from PIL import Image
 from PIL.ExifTags import TAGS
-from typing import Tuple, Dict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Tuple, Dict, Optional
 from pathlib import Path
 
+from core.config import settings
+
+# Formats Pillow cannot open; their headers are not parsed for metadata
+PIL_UNREADABLE_FORMATS = frozenset({"EXR", "HDR", "DPX"})
+
+# Elements per validate_signal_range block (1 MB of float32, L2-sized)
+RANGE_CHECK_BLOCK = 1 << 18
+
+# uint8 code value -> normalized float32, built once at import
+_U8_TO_F32 = np.arange(256, dtype=np.float32) / np.float32(255.0)
+
+# Shot fields copied into metadata["raw_metadata"] for RAW sources
+RAW_METADATA_FIELDS = ("camera_make", "camera_model", "iso_speed", "shutter_speed", "aperture")
+
+def _coerce_raw_field(value):
+    """Decodes libraw byte strings once; other values pass through unchanged."""
+    if isinstance(value, bytes):
+        return value.decode('utf-8', errors='ignore')
+    return value
+
+# Dedicated single-thread ingest worker, created on first load_image_async
+_ingest_pool: Optional[ThreadPoolExecutor] = None
+
 class ImageIngestor:
     @staticmethod
-    def load_image(file_path: str) -> Tuple[np.ndarray, Dict]:
+    def load_image(file_path: str, dtype_hint: Optional[str] = None) -> Tuple[np.ndarray, Dict]:
+        """
+        Args:
+            dtype_hint: "uint16" keeps 16-bit sources (RAW, 16-bit TIFF/PNG) as
+                their integer code values instead of upcasting to float32, at
+                half the resident memory. ColorEngine.transform_buffer reads
+                uint16 natively and normalizes inside the OCIO pass, so the
+                audit and display buffers come out float32 either way.
+        """
         ext = os.path.splitext(file_path)[-1].lower()
         raw_extensions = ['.cr2', '.cr3', '.nef', '.arw', '.dng', '.orf', '.raf', '.rw2', '.ari', '.srw']
+        keep_uint16 = dtype_hint == "uint16"
         
         try:
             if ext in raw_extensions:
-                pixels, meta = ImageIngestor._load_raw(file_path)
+                pixels, meta = ImageIngestor._load_raw(file_path, keep_uint16)
             else:
-                pixels, meta = ImageIngestor._load_generic(file_path)
+                pixels, meta = ImageIngestor._load_generic(file_path, keep_uint16)
+
+            if keep_uint16 and pixels.dtype == np.uint16:
+                # Integer code values: no HDR peaks or negatives to report
+                return pixels, meta
             
             # Ensure float32 for high-precision auditing
             if pixels.dtype != np.float32:
@@ -37,26 +74,45 @@ class ImageIngestor:
             raise IOError(f"Failed to ingest {file_path}: {str(e)}")
 
     @staticmethod
-    def _load_generic(file_path: str) -> Tuple[np.ndarray, Dict]:
+    def load_image_async(file_path: str, dtype_hint: Optional[str] = None) -> Future:
+        """
+        Submits load_image to the ingest worker and returns its Future, so the
+        caller can prefetch image N+1 while detection runs on image N. OpenCV
+        and rawpy release the GIL while decoding, so the two genuinely overlap.
+        """
+        global _ingest_pool
+        if _ingest_pool is None:
+            _ingest_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest")
+        return _ingest_pool.submit(ImageIngestor.load_image, file_path, dtype_hint)
+
+    @staticmethod
+    def _load_generic(file_path: str, keep_uint16: bool = False) -> Tuple[np.ndarray, Dict]:
         """
         Loads non-RAW formats (EXR, DPX, TIFF, JPG) using OpenCV 
         while preserving bit-depth and extracting deep metadata via Pillow.
         """
-        # Load pixels with all flags enabled for HDR/High-Bit depth support
-        pixels = cv2.imread(file_path, cv2.IMREAD_UNCHANGED | cv2.IMREAD_ANYCOLOR | cv2.IMREAD_ANYDEPTH)
+        # Load pixels at full bit depth for HDR/High-Bit depth support. ANYCOLOR
+        # without UNCHANGED decodes colour only: alpha/extra channels are never
+        # materialized (OR-ing in UNCHANGED (-1) set every flag bit).
+        # IGNORE_ORIENTATION keeps UNCHANGED's stored-pixel geometry: without
+        # it OpenCV applies the EXIF rotation and corners land in another frame.
+        pixels = cv2.imread(file_path, cv2.IMREAD_ANYCOLOR | cv2.IMREAD_ANYDEPTH | cv2.IMREAD_IGNORE_ORIENTATION)
         if pixels is None:
             raise IOError(f"Image decoder failed for: {file_path}")
             
-        # Standardize BGR -> RGB
+        # Standardize BGR -> RGB (in place; the decode is already 3-channel)
         if len(pixels.shape) == 3:
-            pixels = cv2.cvtColor(pixels, cv2.COLOR_BGR2RGB)
+            cv2.cvtColor(pixels, cv2.COLOR_BGR2RGB, dst=pixels)
 
         # Normalize Integer types to 0.0-1.0 range. 
         # Float types (EXR/HDR) are left as-is for scene-linear data.
+        # One pass straight into a float32 result, rather than an astype copy
+        # followed by a division.
         if pixels.dtype == np.uint8:
-            pixels = pixels.astype(np.float32) / 255.0
-        elif pixels.dtype == np.uint16:
-            pixels = pixels.astype(np.float32) / 65535.0
+            # 8-bit: a 256-entry gather, exact to the division
+            pixels = cv2.LUT(pixels, _U8_TO_F32)
+        elif pixels.dtype == np.uint16 and not keep_uint16:
+            pixels = np.multiply(pixels, np.float32(1.0 / 65535.0), dtype=np.float32)
 
         # Initialize Metadata Container
         metadata = {
@@ -69,7 +125,22 @@ class ImageIngestor:
             "raw_metadata": {}
         }
 
-        # Deep Metadata Extraction
+        # Deep Metadata Extraction (Pillow has no EXR/HDR/DPX decoder, so
+        # those skip a file open that could only fail)
+        if metadata["file_format"] not in PIL_UNREADABLE_FORMATS:
+            ImageIngestor._read_pil_metadata(file_path, metadata)
+
+        if metadata["colorspace_hint"] == "Unknown":
+            if metadata["file_format"] == "EXR":
+                metadata["colorspace_hint"] = "Linear"
+            elif metadata["file_format"] in ["JPG", "JPEG", "PNG"]:
+                metadata["colorspace_hint"] = "sRGB"
+
+        return pixels, metadata
+
+    @staticmethod
+    def _read_pil_metadata(file_path: str, metadata: Dict):
+        """Fills raw_metadata and colorspace_hint from Pillow's header/EXIF parse."""
         try:
             with Image.open(file_path) as img:
                 ext_meta = {}
@@ -103,35 +174,42 @@ class ImageIngestor:
         except Exception as meta_error:
             print(f"[METADATA WARNING] Could not parse headers: {meta_error}")
 
-        if metadata["colorspace_hint"] == "Unknown":
-            if metadata["file_format"] == "EXR":
-                metadata["colorspace_hint"] = "Linear"
-            elif metadata["file_format"] in ["JPG", "JPEG", "PNG"]:
-                metadata["colorspace_hint"] = "sRGB"
-
-        return pixels, metadata
-
     @staticmethod
-    def _load_raw(file_path: str) -> Tuple[np.ndarray, Dict]:
+    def _load_raw(file_path: str, keep_uint16: bool = False) -> Tuple[np.ndarray, Dict]:
         """
-        Processes Digital Camera RAW files into a scene-linear float32 buffer.
+        Processes Digital Camera RAW files into a scene-linear float32 buffer
+        (or its uint16 code values when keep_uint16 is set).
         """
+        # Draft decodes demosaic on the half-size grid with a cheap linear kernel,
+        # and keep sensor orientation (user_flip=0) to skip libraw's rotate copy;
+        # chart detection does not depend on orientation.
+        draft = settings.ingest_quality == "draft"
         with rawpy.imread(file_path) as raw:
             rgb_linear = raw.postprocess(
                 use_camera_wb=True, 
                 no_auto_bright=True, 
                 output_bps=16, 
-                gamma=(1,1)
+                gamma=(1,1),
+                half_size=draft,
+                demosaic_algorithm=rawpy.DemosaicAlgorithm.LINEAR if draft else None,
+                user_flip=0 if draft else None
             )
-            pixels = rgb_linear.astype(np.float32) / 65535.0
+            # libraw flip code of the shot (0 = none, 3 = 180, 5/6 = 90 CCW/CW)
+            orientation = raw.sizes.flip
+            # Fused uint16 -> float32 normalization (single pass, reciprocal multiply)
+            if keep_uint16:
+                pixels = rgb_linear
+            else:
+                pixels = np.multiply(rgb_linear, np.float32(1.0 / 65535.0), dtype=np.float32)
             
-            # Extract values first
-            make = getattr(raw, 'camera_make', None)
-            model = getattr(raw, 'camera_model', None)
-
-            # Ensure they are strings, not 'bytes'
-            if isinstance(make, bytes): make = make.decode('utf-8', errors='ignore')
-            if isinstance(model, bytes): model = model.decode('utf-8', errors='ignore')
+            # One snapshot of the shot info (a single libraw call) instead of a
+            # lookup per field; make/model are read from the RawPy when exposed
+            other = getattr(raw, 'other', None)
+            shot = other._asdict() if other is not None else {}
+            raw_metadata = {
+                k: _coerce_raw_field(shot[k] if k in shot else getattr(raw, k, None))
+                for k in RAW_METADATA_FIELDS
+            }
             
             metadata = {
                 "width": pixels.shape[1],
@@ -140,18 +218,23 @@ class ImageIngestor:
                 "file_format": "Camera RAW",
                 "colorspace_hint": "Linear",
                 "is_raw": True,
-                "raw_metadata": {
-                    "camera_make": make,
-                    "camera_model": model,
-                }
+                "orientation": orientation,
+                "oriented": not draft,
+                "raw_metadata": raw_metadata
             }
             return pixels, metadata
 
     @staticmethod
     def validate_signal_range(pixels: np.ndarray):
         """Monitors for HDR peaks or illegal negative values."""
-        p_max = np.max(pixels)
-        p_min = np.min(pixels)
+        # Min and max per cache-sized block: each block is streamed from
+        # memory once and reduced twice while it is still in cache.
+        flat = pixels.ravel()
+        p_min, p_max = np.inf, -np.inf
+        for start in range(0, flat.size, RANGE_CHECK_BLOCK):
+            block = flat[start:start + RANGE_CHECK_BLOCK]
+            p_min = np.minimum(p_min, block.min())
+            p_max = np.maximum(p_max, block.max())
         if p_max > 1.0:
             print(f"[STATUS] Signal: HDR/Linear detected (Max: {p_max:.3f})")
         if p_min < 0.0:
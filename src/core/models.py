@@ -11,7 +11,7 @@ from datetime import datetime
 from enum import Enum, auto
 
 
-@dataclass(frozen=False)
+@dataclass(frozen=False, slots=True)
 class ColorPatch:
     """
     Represents a single sampled patch from a physical color reference chart.
@@ -22,6 +22,8 @@ class ColorPatch:
         target_rgb (np.ndarray): The mathematical 'Ideal' RGB values for the specific color space.
         local_center (Tuple[int, int]): The (x, y) center coordinate relative to the rectified crop.
         index (int): The patch index (0-23 for Macbeth, 0-5 for Greyscale).
+
+    Slotted (no per-instance __dict__): every audit creates one per patch.
     """
     name: str
     observed_rgb: np.ndarray
@@ -38,11 +40,9 @@ class ColorPatch:
     visual_ref_rgb: Optional[np.ndarray] = None
 
     def __post_init__(self):
-        """Validates that RGB data is stored as high-precision floats."""
-        if self.observed_rgb.dtype != np.float32 and self.observed_rgb.dtype != np.float64:
-            object.__setattr__(self, 'observed_rgb', self.observed_rgb.astype(np.float32))
-        if self.target_rgb.dtype != np.float32 and self.target_rgb.dtype != np.float64:
-            object.__setattr__(self, 'target_rgb', self.target_rgb.astype(np.float32))
+        """Standardizes RGB data on float32 (no copy when it already is)."""
+        self.observed_rgb = np.asarray(self.observed_rgb, dtype=np.float32)
+        self.target_rgb = np.asarray(self.target_rgb, dtype=np.float32)
 
 class AuditStatus(Enum):
     IDLE = auto()          # Just loaded, no math done yet
@@ -51,6 +51,9 @@ class AuditStatus(Enum):
     MANUAL_EDIT = auto()   # User moved corners; needs a re-sample
     FAILED = auto()        # AI couldn't find a chart
 
+# AuditResult fields packed into AuditResult.sop
+_CDL_FIELDS = frozenset({"slope", "offset", "power", "sat"})
+
 @dataclass
 class AuditResult:
     file_path: str
@@ -91,20 +94,70 @@ class AuditResult:
     patches: List[ColorPatch] = field(default_factory=list)
     timestamp: Optional[str] = None
 
+    # Stacked patch RGBs (see rgb_arrays), rebuilt when the patches change
+    _rgb_cache: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+    # Packed CDL (see sop), dropped whenever slope/offset/power/sat is assigned
+    _sop_cache: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)
+
+    def __setattr__(self, name, value):
+        if name in _CDL_FIELDS:
+            object.__setattr__(self, "_sop_cache", None)
+        object.__setattr__(self, name, value)
+
+    @property
+    def sop(self) -> np.ndarray:
+        """
+        The CDL packed once into a read-only (3, 4) float32 array: rows are
+        slope/offset/power and column 3 carries sat. The exporters read this
+        block; assigning any of the four fields repacks it on the next access.
+        """
+        sop = self._sop_cache
+        if sop is None:
+            sop = np.empty((3, 4), dtype=np.float32)
+            sop[0, :3] = self.slope
+            sop[1, :3] = self.offset
+            sop[2, :3] = self.power
+            sop[:, 3] = self.sat
+            sop.setflags(write=False)
+            self._sop_cache = sop
+        return sop
+
     def get_sop_summary(self) -> str:
         return (f"Slope: {self.slope} | Offset: {self.offset} | "
                 f"Power: {self.power} | Sat: {self.sat}")
     
+    def rgb_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns the patches as structure-of-arrays: observed (N, 3), target
+        (N, 3) and patch index (N,). Cached until a patch, or one of its RGB
+        arrays, is replaced.
+        """
+        sources = [(p, p.observed_rgb, p.target_rgb) for p in self.patches]
+        cached = self._rgb_cache
+        if cached is not None and len(cached[0]) == len(sources) and all(
+                a is b for old, new in zip(cached[0], sources) for a, b in zip(old, new)):
+            return cached[1]
+
+        count = len(sources)
+        obs = np.asarray([p.observed_rgb for p in self.patches], dtype=np.float32).reshape(count, 3)
+        targ = np.asarray([p.target_rgb for p in self.patches], dtype=np.float32).reshape(count, 3)
+        idx = np.fromiter((p.index for p in self.patches), dtype=np.int32, count=count)
+        self._rgb_cache = (sources, (obs, targ, idx))
+        return obs, targ, idx
+
     def get_neutral_patches(self) -> List[ColorPatch]:
         """Returns patches flagged as neutral in the active template."""
         from core.config import settings
         template = settings.get_current_template()
-        neutral_indices = template.neutral_indices
-        
-        return [
-            p for p in self.patches 
-            if p.index in neutral_indices or p.name.replace("Patch_", "") in neutral_indices
-        ]
+
+        if template.neutral_index_array is not None:
+            # Integer-keyed chart: one vectorized membership test on the
+            # cached patch-index column of rgb_arrays
+            keep = np.isin(self.rgb_arrays()[2], template.neutral_index_array)
+            return [p for p, k in zip(self.patches, keep.tolist()) if k]
+
+        neutral_names = frozenset(template.neutral_indices)
+        return [p for p in self.patches if p.name.replace("Patch_", "") in neutral_names]
     
 @dataclass
 class AuditTask:
@@ -18,6 +18,7 @@ from typing import List, Optional, Dict
 
 from PySide6.QtCore import QObject, Signal, QThread, Slot
 from .models import AuditResult, AuditStatus, ColorPatch
+from .ingest import ImageIngestor
 
 class AuditWorker(QObject):
     """
@@ -41,11 +42,13 @@ class AuditWorker(QObject):
                 break
             
             try:
-                # Note: In the final app, the SessionManager/UI will provide 
-                # the actual image buffers to the sampler here.
-                # result = self.sampler.sample_all(display_buf, audit_buf, file_path)
-                # self.image_done.emit(result)
-                pass
+                # 16-bit sources stay uint16 until the OCIO pass normalizes them
+                pixels, _ = ImageIngestor.load_image(file_path, dtype_hint="uint16")
+                audit_buf, display_buf = self.sampler.color_engine.get_dual_buffers(
+                    pixels, AuditResult(file_path=file_path))
+                del pixels
+                result = self.sampler.sample_all(display_buf, audit_buf, file_path)
+                self.image_done.emit(result)
             except Exception as e:
                 self.error.emit(f"Failed {file_path}: {str(e)}")
         
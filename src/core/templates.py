@@ -1,5 +1,7 @@
 from dataclasses import dataclass, field
+from types import MappingProxyType
 from typing import Tuple, List, Optional, Dict, Any
+import numpy as np
 
 @dataclass(frozen=True)
 class ChartTemplate:
@@ -20,6 +22,15 @@ class ChartTemplate:
     neutral_indices: List[Any] = field(default_factory=list)
     orientation_anchor: Optional[Tuple[Any, Any]] = None
     color_targets: Dict[Any, List[float]] = field(default_factory=dict)
+    # Integer neutral_indices as a read-only int32 array, for vectorized
+    # gathers (None for name-keyed anchor charts)
+    neutral_index_array: Optional[np.ndarray] = field(init=False, default=None, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.neutral_indices and all(isinstance(i, int) for i in self.neutral_indices):
+            indices = np.asarray(self.neutral_indices, dtype=np.int32)
+            indices.setflags(write=False)
+            object.__setattr__(self, "neutral_index_array", indices)
 
 # 1. MACBETH 24 (Tier 4: Color Matrix)
 MACBETH_24 = ChartTemplate(
@@ -111,9 +122,10 @@ GRAY_CARD = ChartTemplate(
     color_targets={"center": [0.18, 0.18, 0.18]}
 )
 
-CHART_LIBRARY = {
+# Read-only: shared by every module, and derived tables (e.g. chart signatures) are built from it once
+CHART_LIBRARY = MappingProxyType({
     "macbeth_24": MACBETH_24,
     "kodak_gray_plus": KODAK_GRAY_PLUS,
     "grayscale_11": GRAYSCALE_11,
     "gray_card": GRAY_CARD
-}
\ No newline at end of file
+})
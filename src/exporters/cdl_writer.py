@@ -26,9 +26,10 @@ class CDLWriter:
         # For gray_card, we lock Offset to 0 and Power to 1
         is_slope_only = "Slope Only" in str(result.template_name) # Or check config
         
-        slope_vals = result.slope
-        offset_vals = result.offset if not is_slope_only else [0.0, 0.0, 0.0]
-        power_vals = result.power if not is_slope_only else [1.0, 1.0, 1.0]
+        packed = result.sop
+        slope_vals = packed[0, :3]
+        offset_vals = packed[1, :3] if not is_slope_only else [0.0, 0.0, 0.0]
+        power_vals = packed[2, :3] if not is_slope_only else [1.0, 1.0, 1.0]
 
         def fmt(vals): return f"{vals[0]:.6f} {vals[1]:.6f} {vals[2]:.6f}"
 
@@ -39,7 +40,7 @@ class CDLWriter:
         
         # 4. Saturation
         sat_node = ET.SubElement(cc, "SatOperation")
-        ET.SubElement(sat_node, "Saturation").text = f"{result.sat:.6f}"
+        ET.SubElement(sat_node, "Saturation").text = f"{packed[0, 3]:.6f}"
         
         # 5. Metadata Description
         desc = ET.SubElement(cc, "Description")
@@ -41,7 +41,8 @@ class LUTWriter:
         # 2. Apply the Math
         # Apply CDL (SOP): (pixels * slope) + offset
         # Note: We'll skip Power/Saturation for this baseline to keep it linear
-        transformed = (pixels * result.slope) + result.offset
+        sop = result.sop
+        transformed = (pixels * sop[0, :3]) + sop[1, :3]
         
         # Apply 3x3 Matrix from Task 3
         if result.matrix_3x3 is not None:
@@ -41,6 +41,7 @@ class ReportGenerator:
         ]
 
         # Flatten Matrix
+        sop = result.sop
         m = result.matrix_3x3.flatten() if result.matrix_3x3 is not None else [1,0,0,0,1,0,0,0,1]
 
         row = [
@@ -52,8 +53,8 @@ class ReportGenerator:
             result.display_space or settings.default_display_space,
             f"{result.alignment_integrity:.4f}",
             f"{result.delta_e_mean:.6f}", f"{result.delta_e_max:.6f}",
-            *result.slope, *result.offset, *result.power,
-            f"{result.sat:.4f}", *m,
+            *sop[0, :3], *sop[1, :3], *sop[2, :3],
+            f"{sop[0, 3]:.4f}", *m,
             format_corners(result.corners),
             result.ai_reasoning.strip(" | ")
         ]
@@ -191,11 +192,12 @@ class AuditPDF(FPDF):
         
         # Use a single Multi-cell for the whole block to keep it contained
         m = res.matrix_3x3
+        sop = res.sop
         tech_text = (
             f"ASC-CDL:\n"
-            f"  SLOPE:  {res.slope[0]:.4f} {res.slope[1]:.4f} {res.slope[2]:.4f}\n"
-            f"  OFFSET: {res.offset[0]:.4f} {res.offset[1]:.4f} {res.offset[2]:.4f}\n"
-            f"  SAT:    {res.sat:.4f}\n\n"
+            f"  SLOPE:  {sop[0, 0]:.4f} {sop[0, 1]:.4f} {sop[0, 2]:.4f}\n"
+            f"  OFFSET: {sop[1, 0]:.4f} {sop[1, 1]:.4f} {sop[1, 2]:.4f}\n"
+            f"  SAT:    {sop[0, 3]:.4f}\n\n"
             f"COLOR MATRIX:\n"
             f"  [{m[0][0]:.3f}, {m[0][1]:.3f}, {m[0][2]:.3f}]\n"
             f"  [{m[1][0]:.3f}, {m[1][1]:.3f}, {m[1][2]:.3f}]\n"
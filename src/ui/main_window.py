@@ -215,12 +215,16 @@ class MainWindow(QMainWindow):
             path, _ = QFileDialog.getOpenFileName(self, "Open Image", "", "Images (*.exr *.jpg *.png *.cr2 *.arw)")
             if path: files = [path]
 
-        for f_path in files:
-            self._add_to_table(f_path)
-
-    def _add_to_table(self, path):
+        # Decode the next file on the ingest worker while this row is built
+        pending = ImageIngestor.load_image_async(files[0]) if files else None
+        for i, f_path in enumerate(files):
+            current = pending
+            pending = ImageIngestor.load_image_async(files[i + 1]) if i + 1 < len(files) else None
+            self._add_to_table(f_path, current)
+
+    def _add_to_table(self, path, pending=None):
         try:
-            pixels, meta = ImageIngestor.load_image(path)
+            pixels, meta = pending.result() if pending is not None else ImageIngestor.load_image(path)
             row = self.table.rowCount()
             self.table.insertRow(row)
 
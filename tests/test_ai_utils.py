@@ -0,0 +1,39 @@
+import os
+import sys
+from pathlib import Path
+
+# Path logic
+root_path = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root_path))
+sys.path.insert(0, str(root_path / "src"))
+
+import numpy as np
+from ai.utils import _histogram_percentiles
+
+QUANTILES = (0.02, 0.5, 0.98)
+
+def test_percentiles_with_hot_pixel():
+    # A dim plate with one hot pixel stretching the range a thousandfold
+    rng = np.random.default_rng(11)
+    plate = rng.uniform(0.0, 0.01, size=(256, 256, 3)).astype(np.float32)
+    plate[17, 42, 1] = 10.0
+
+    expected = np.percentile(plate, np.multiply(QUANTILES, 100.0))
+    estimated = _histogram_percentiles(plate, QUANTILES)
+    assert np.allclose(estimated, expected, rtol=0, atol=1e-7)
+
+def test_percentiles_small_and_flat_inputs():
+    tiny = np.array([0.0, 0.1, 0.25, 1.0, 5.0], dtype=np.float32)
+    assert np.allclose(_histogram_percentiles(tiny, QUANTILES),
+                       np.percentile(tiny, np.multiply(QUANTILES, 100.0)), atol=1e-7)
+
+    flat = np.full((128, 128), 0.18, dtype=np.float32)
+    assert np.allclose(_histogram_percentiles(flat, QUANTILES), 0.18)
+
+    # Clustered values: most of the buffer shares one histogram bin
+    clustered = np.concatenate([np.full(50000, 0.5, np.float32), [0.0, 1.0]]).astype(np.float32)
+    assert np.allclose(_histogram_percentiles(clustered, (0.0, 0.5, 1.0)), [0.0, 0.5, 1.0])
+
+if __name__ == "__main__":
+    test_percentiles_with_hot_pixel()
+    test_percentiles_small_and_flat_inputs()
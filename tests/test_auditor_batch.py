@@ -0,0 +1,98 @@
+import os
+import sys
+from pathlib import Path
+
+# Path logic
+root_path = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root_path))
+sys.path.insert(0, str(root_path / "src"))
+
+import numpy as np
+import colour
+from core.auditor import Auditor
+from core.models import AuditResult, ColorPatch
+from core.config import settings
+from core.templates import MACBETH_24
+
+# --- Per-patch reference math (the original, unbatched Auditor) ---
+
+def baseline_delta_e(observed_rgb, target_rgb) -> float:
+    if np.all(target_rgb <= 0): return 0.0
+    obs_lab = colour.XYZ_to_Lab(colour.RGB_to_XYZ(observed_rgb, 'ACEScg'))
+    targ_lab = colour.XYZ_to_Lab(colour.RGB_to_XYZ(target_rgb, 'ACEScg'))
+    return float(colour.delta_E(obs_lab, targ_lab, method='CIE 2000'))
+
+def baseline_ramp_fit(obs, targ):
+    slopes, offsets = [], []
+    for i in range(3):
+        m, c = np.polyfit(obs[:, i], targ[:, i], 1)
+        slopes.append(m)
+        offsets.append(c)
+    return np.clip(slopes, 0.0, 4.0), np.clip(offsets, -1.0, 1.0)
+
+def make_macbeth_result() -> AuditResult:
+    """A Macbeth 24 shot with a fixed per-channel gain error and some noise."""
+    rng = np.random.default_rng(7)
+    gain = np.array([1.12, 0.97, 0.88])
+    patches = []
+    for i in range(24):
+        targ = np.array(MACBETH_24.color_targets[i])
+        obs = targ * gain + rng.normal(0.0, 0.004, 3)
+        patches.append(ColorPatch(name=f"Patch_{i}", index=i, local_center=(0, 0),
+                                  observed_rgb=obs, target_rgb=targ))
+    return AuditResult(file_path="batched_macbeth.exr", template_name="macbeth_24", patches=patches)
+
+def test_delta_e_batch_matches_per_patch():
+    auditor = Auditor()
+    result = make_macbeth_result()
+    obs = np.array([p.observed_rgb for p in result.patches], dtype=np.float32)
+    targ = np.array([p.target_rgb for p in result.patches], dtype=np.float32)
+
+    # Rows with no reference value (all-zero / negative target) must score 0.0
+    obs = np.vstack([obs, [[0.3, 0.2, 0.1], [0.05, 0.05, 0.05]]]).astype(np.float32)
+    targ = np.vstack([targ, [[0.0, 0.0, 0.0], [-0.01, 0.0, -0.02]]]).astype(np.float32)
+
+    expected = np.array([baseline_delta_e(o, t) for o, t in zip(obs, targ)])
+    batched = auditor.calculate_delta_e_batch(obs, targ)
+
+    assert batched.shape == expected.shape
+    assert np.allclose(batched, expected, rtol=1e-4, atol=1e-3)
+    assert batched[-2] == 0.0 and batched[-1] == 0.0
+
+    # Memoized repeat: same values, and the shared array is read-only
+    again = auditor.calculate_delta_e_batch(obs, targ)
+    assert np.array_equal(again, batched)
+    assert not again.flags.writeable
+
+    # The scalar wrapper agrees with the per-patch reference too
+    assert np.isclose(auditor.calculate_delta_e(obs[3], targ[3]), expected[3], rtol=1e-4, atol=1e-3)
+    assert auditor.calculate_delta_e(obs[-2], targ[-2]) == 0.0
+
+def test_perform_audit_matches_per_patch():
+    settings.active_chart_type = "macbeth_24"
+    auditor = Auditor()
+    result = make_macbeth_result()
+    obs = np.array([p.observed_rgb for p in result.patches], dtype=np.float64)
+    targ = np.array([p.target_rgb for p in result.patches], dtype=np.float64)
+
+    auditor.perform_audit(result)
+
+    # Per-patch Delta E written back onto the patches
+    expected_de = [baseline_delta_e(o, t) for o, t in zip(obs, targ)]
+    assert np.allclose([p.delta_e for p in result.patches], expected_de, rtol=1e-4, atol=1e-3)
+
+    # Neutralization CDL: per-channel polyfit through the neutral row (18-23)
+    slopes, offsets = baseline_ramp_fit(obs[18:24], targ[18:24])
+    assert np.allclose(result.slope, slopes, atol=1e-4)
+    assert np.allclose(result.offset, offsets, atol=1e-4)
+
+    # 3x3 matrix and its linear-space residuals over the 18 colour patches
+    matrix = np.linalg.lstsq(obs[:18], targ[:18], rcond=None)[0]
+    errors = np.linalg.norm(obs[:18] @ matrix - targ[:18], axis=1)
+    assert np.allclose(result.matrix_3x3, matrix, atol=1e-4)
+    assert np.isclose(result.delta_e_mean, errors.mean(), atol=1e-4)
+    assert np.isclose(result.delta_e_max, errors.max(), atol=1e-4)
+
+if __name__ == "__main__":
+    test_delta_e_batch_matches_per_patch()
+    test_perform_audit_matches_per_patch()
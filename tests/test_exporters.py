@@ -15,6 +15,7 @@ from src.exporters.report_generator import ReportGenerator
 from core.models import AuditResult, ColorPatch
 import numpy as np
 from datetime import datetime
+from dataclasses import fields
 
 def test_cdl_export():
     # Mock a result
@@ -54,6 +55,40 @@ def test_cdl_export():
     assert "1.200000" in slope_text
     print("SUCCESS: CDL Exported and Verified.")
 
+def test_cdl_roundtrip_values():
+    # Constructor CDL values must be plain fields and survive the writer intact
+    res = AuditResult(
+        file_path="C:/Project/Plate.exr",
+        template_name="macbeth_24",
+        slope=np.array([1.25, 0.5, 2.0], dtype=np.float32),
+        offset=np.array([0.02, -0.03, 0.0], dtype=np.float32),
+        power=np.array([0.9, 1.0, 1.1], dtype=np.float32),
+        sat=0.8
+    )
+    field_names = {f.name for f in fields(AuditResult)}
+    assert {"slope", "offset", "power", "sat"} <= field_names
+
+    # sop is packed once, read-only, and repacked after a field is assigned
+    packed = res.sop
+    assert packed is res.sop and not packed.flags.writeable
+    assert np.allclose(packed[0, :3], [1.25, 0.5, 2.0]) and np.isclose(packed[0, 3], 0.8)
+    res.power = np.array([0.9, 1.0, 1.1], dtype=np.float32)
+    assert res.sop is not packed and np.allclose(res.sop, packed)
+
+    out_path = "tests/output/test_export.roundtrip.cdl"
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    CDLWriter.write(res, out_path)
+
+    ns = {'cdl': 'urn:ASC:CDL:v1.01'}
+    root = ET.parse(out_path).getroot()
+    def read(tag):
+        return np.array(root.find(f".//cdl:{tag}", ns).text.split(), dtype=np.float64)
+
+    assert np.allclose(read("Slope"), res.slope, atol=1e-6)
+    assert np.allclose(read("Offset"), res.offset, atol=1e-6)
+    assert np.allclose(read("Power"), res.power, atol=1e-6)
+    assert np.isclose(read("Saturation")[0], 0.8, atol=1e-6)
+
 def test_lut_export():
     # 1. Setup a result with a known 3x3 Matrix (e.g., swapping R and G)
     res = AuditResult(
@@ -0,0 +1,42 @@
+import os
+import sys
+from pathlib import Path
+
+# Path logic
+root_path = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root_path))
+sys.path.insert(0, str(root_path / "src"))
+
+import cv2
+import numpy as np
+from core.ingest import ImageIngestor
+from core.color_engine import ColorEngine
+from core.models import AuditResult
+
+def test_uint16_ingest_matches_float():
+    output_dir = root_path / "tests" / "output"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    png_path = str(output_dir / "test_export.uint16.png")
+
+    rng = np.random.default_rng(3)
+    codes = rng.integers(0, 65536, size=(32, 48, 3), dtype=np.uint16)
+    cv2.imwrite(png_path, codes)
+
+    native, _ = ImageIngestor.load_image(png_path, dtype_hint="uint16")
+    as_float, _ = ImageIngestor.load_image(png_path)
+    assert native.dtype == np.uint16
+    assert as_float.dtype == np.float32
+    assert native.nbytes * 2 == as_float.nbytes
+
+    # Same audit/display buffers whichever way the source was held
+    engine = ColorEngine()
+    spaces = engine.get_input_spaces()
+    result = AuditResult(file_path=png_path, input_space=spaces[0], audit_space=spaces[1], display_space=spaces[1])
+    audit_u16, display_u16 = engine.get_dual_buffers(native, result)
+    audit_f32, display_f32 = engine.get_dual_buffers(as_float, result)
+    assert audit_u16.dtype == np.float32
+    assert np.allclose(audit_u16, audit_f32, atol=1e-5)
+    assert np.allclose(display_u16, display_f32, atol=1e-5)
+
+if __name__ == "__main__":
+    test_uint16_ingest_matches_float()
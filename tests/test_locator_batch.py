@@ -0,0 +1,95 @@
+import os
+import sys
+from pathlib import Path
+
+# Path logic
+root_path = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root_path))
+sys.path.insert(0, str(root_path / "src"))
+
+import numpy as np
+from ai.locator import ChartLocator
+from ai.topology import ChartTopology
+from core.config import settings
+from core.templates import MACBETH_24
+
+class FakeDetector:
+    """Stands in for ChartDetector: returns known corners per frame, counts passes."""
+    instances = 0
+
+    def __init__(self, corners_by_frame: dict):
+        FakeDetector.instances += 1
+        self.corners_by_frame = corners_by_frame
+        self.single_calls = 0
+        self.batch_calls = 0
+
+    def detect_with_fallback(self, display_buffer, audit_buffer):
+        self.single_calls += 1
+        corners = self.corners_by_frame.get(id(display_buffer))
+        return (corners, "chart found") if corners is not None else ({}, "nothing found")
+
+    def detect_with_fallback_batch(self, display_buffers, audit_buffers):
+        self.batch_calls += 1
+        outputs = []
+        for display_buffer in display_buffers:
+            corners = self.corners_by_frame.get(id(display_buffer))
+            outputs.append((corners, "chart found") if corners is not None else ({}, "nothing found"))
+        return outputs
+
+    def extract_polygons(self, roi_result, width, height):
+        if isinstance(roi_result, dict):
+            return np.array([])
+        return roi_result.astype(np.float32)
+
+def make_frames():
+    """Two Macbeth charts at different spots on a dark plate, plus one empty plate."""
+    settings.active_chart_type = "macbeth_24"
+    rect_w, rect_h = MACBETH_24.rectified_size
+    chart = np.full((rect_h, rect_w, 3), 0.35, dtype=np.float32)
+    half = MACBETH_24.sample_size
+    for i, (y, x) in enumerate(ChartTopology().analyze()):
+        chart[y - half:y + half, x - half:x + half] = MACBETH_24.color_targets[i]
+
+    frames, corners_by_frame = [], {}
+    for offset in ((60, 40), (200, 150), None):
+        x0, y0 = offset if offset else (None, None)
+        audit = np.full((rect_h + 300, rect_w + 300, 3), 0.02, dtype=np.float32)
+        if x0 is not None:
+            audit[y0:y0 + rect_h, x0:x0 + rect_w] = chart
+        display = np.clip(audit, 0, 1) ** (1 / 2.2)
+        if x0 is not None:
+            # Slightly off corners, so the edge snap has work to do
+            corners_by_frame[id(display)] = np.array(
+                [[x0 + 4, y0 - 3], [x0 + rect_w - 5, y0 + 2],
+                 [x0 + rect_w + 3, y0 + rect_h - 4], [x0 - 2, y0 + rect_h + 3]], dtype=np.float32)
+        frames.append((display, audit))
+    return frames, corners_by_frame
+
+def test_locate_batch_matches_locate():
+    frames, corners_by_frame = make_frames()
+    displays = [d for d, _ in frames]
+    audits = [a for _, a in frames]
+
+    for use_snap in (True, False):
+        FakeDetector.instances = 0
+        locator = ChartLocator(lambda: FakeDetector(corners_by_frame))
+        batched = locator.locate_batch(displays, audits, use_snap=use_snap)
+        single = [locator.locate(d, a, use_snap=use_snap) for d, a in frames]
+
+        # The lazy factory builds one detector and the batch is a single pass
+        assert FakeDetector.instances == 1
+        assert locator.engine.batch_calls == 1
+        assert len(batched) == len(frames)
+        for (b_points, b_reason), (s_points, s_reason) in zip(batched, single):
+            assert b_reason == s_reason
+            if s_points is None:
+                assert b_points is None
+            else:
+                assert np.allclose(b_points, s_points)
+        assert batched[-1][0] is None
+        if use_snap:
+            # The snap ran in both paths (the raw AI corners are off by a few px)
+            assert not np.allclose(batched[0][0], corners_by_frame[id(displays[0])])
+
+if __name__ == "__main__":
+    test_locate_batch_matches_locate()
@@ -1,5 +1,7 @@
 import sys
 import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import numpy as np
 from PIL import Image
@@ -15,11 +17,16 @@ from ai.sampler import PatchSampler
 from core.config import settings
 from ai.topology import ChartTopology
 
+# uint8 code value -> normalized float32 (one gather instead of copy/upcast/divide)
+_U8_LUT = np.arange(256, dtype=np.float32) / np.float32(255.0)
+
 def mock_load_jpg(path: str):
     """Temporary loader to bypass OIIO requirement for .jpg testing."""
     with Image.open(path) as img:
+        # JPEG only: decode via scaled IDCT to >= 2048px (no-op for other formats)
+        img.draft("RGB", (2048, 2048))
         img = img.convert("RGB")
-        return np.array(img).astype(np.float32) / 255.0
+        return _U8_LUT[np.asarray(img, dtype=np.uint8)]
 
 def run_integration_test(image_path: str, label: str):
     print(f"\n--- DIAGNOSTIC RUN: {label} ---")
@@ -61,8 +68,22 @@ if __name__ == "__main__":
     run_integration_test("D:/_repos/precision-color-auditor/test_assets/scifiMacbeth.jpg", "MacbethScifi")
     run_integration_test("D:/_repos/precision-color-auditor/test_assets/macbeth_ref.jpg", "MacbethRef")
     run_integration_test("D:/_repos/precision-color-auditor/test_assets/macbeth_ref2.jpg", "MacbethRefWide") """
-    run_integration_test("D:/_repos/precision-color-auditor/test_assets/blackMacbethrotate.jpeg", "BlackMacbeth90")
-    run_integration_test("D:/_repos/precision-color-auditor/test_assets/macbeth_ref2rotate.jpg", "MacbethRefWide180")
+    TESTS = [
+        ("D:/_repos/precision-color-auditor/test_assets/blackMacbethrotate.jpeg", "BlackMacbeth90"),
+        ("D:/_repos/precision-color-auditor/test_assets/macbeth_ref2rotate.jpg", "MacbethRefWide180"),
+    ]
+
+    # Cases are independent: run them side by side on CPU hosts. Each spawned
+    # worker is a fresh process that loads its own Florence-2 copy (the engine
+    # cache is per process). On CUDA that would mean one model, CUDA context
+    # and compile warm-up per worker on the same GPU, so run one at a time.
+    import torch
+    if torch.cuda.is_available():
+        workers = 1
+    else:
+        workers = max(1, min(len(TESTS), (os.cpu_count() or 2) // 2))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as ex:
+        list(ex.map(run_integration_test, *zip(*TESTS)))
 
     #GreyCards
     """ run_integration_test("D:/_repos/precision-color-auditor/test_assets/KodakGray.jpg", "KodakGrayCardPlus")
@@ -0,0 +1,42 @@
+import os
+import sys
+from pathlib import Path
+
+# Path logic
+root_path = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root_path))
+sys.path.insert(0, str(root_path / "src"))
+sys.path.insert(0, str(root_path / "tests"))
+
+import numpy as np
+from ai.sampler import PatchSampler
+from core.models import AuditStatus
+from test_locator_batch import FakeDetector, make_frames
+
+def test_sample_all_batch_matches_sample_all():
+    frames, corners_by_frame = make_frames()
+    displays = [d for d, _ in frames]
+    audits = [a for _, a in frames]
+    paths = [f"frame_{i}.exr" for i in range(len(frames))]
+
+    sampler = PatchSampler(None, FakeDetector(corners_by_frame))
+    batched = sampler.sample_all_batch(displays, audits, paths)
+    single = [sampler.sample_all(d, a, p) for (d, a), p in zip(frames, paths)]
+
+    assert [r.file_path for r in batched] == paths
+    for b, s in zip(batched, single):
+        assert b.status == s.status
+        assert b.ai_reasoning == s.ai_reasoning
+        assert len(b.patches) == len(s.patches)
+        for bp, sp in zip(b.patches, s.patches):
+            assert np.allclose(bp.observed_rgb, sp.observed_rgb)
+            assert bp.delta_e == sp.delta_e
+        if s.rectified_buffer is not None:
+            assert np.array_equal(b.rectified_buffer, s.rectified_buffer)
+
+    # Both charts sampled, the empty plate reported as a failed detection
+    assert all(len(r.patches) == 24 for r in batched[:2])
+    assert batched[-1].status == AuditStatus.FAILED
+
+if __name__ == "__main__":
+    test_sample_all_batch_matches_sample_all()
@@ -0,0 +1,52 @@
+import os
+import sys
+from pathlib import Path
+
+# Path logic
+root_path = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(root_path))
+sys.path.insert(0, str(root_path / "src"))
+
+import numpy as np
+from ai.sampler import PatchSampler
+from ai.topology import ChartTopology
+from core.config import settings
+from core.templates import MACBETH_24
+
+# Manual corners are supplied, so the detector is never touched
+class MockEngine: pass
+
+def make_rectified_macbeth() -> np.ndarray:
+    """A correctly oriented Macbeth 24 at the template's rectified size."""
+    rect_w, rect_h = MACBETH_24.rectified_size
+    chart = np.zeros((rect_h, rect_w, 3), dtype=np.float32)
+    half = MACBETH_24.sample_size
+    for i, (y, x) in enumerate(ChartTopology().analyze()):
+        chart[y - half:y + half, x - half:x + half] = MACBETH_24.color_targets[i]
+    return chart
+
+def test_dark_display_keeps_orientation():
+    settings.active_chart_type = "macbeth_24"
+    audit = make_rectified_macbeth()
+    # A very dark display LUT: every anchor rounds to 0 in 8 bits
+    display = audit * 0.001
+    h, w = audit.shape[:2]
+    corners = np.array([[0, 0], [w - 1, 0], [w - 1, h - 1], [0, h - 1]], dtype=np.float32)
+
+    try:
+        for qc_dtype in ("uint8", "float32"):
+            settings.qc_warp_dtype = qc_dtype
+            sampler = PatchSampler(None, MockEngine())
+            result = sampler.sample_all(display, audit, "dark_chart.exr",
+                                        manual_corners=corners, use_snap=False)
+
+            observed = np.array([p.observed_rgb for p in result.patches])
+            targets = np.array([p.target_rgb for p in result.patches])
+            # Not flipped: every patch reads its own reference colour
+            assert np.allclose(observed, targets, atol=1e-3), qc_dtype
+            assert result.rectified_buffer.dtype == np.uint8
+    finally:
+        settings.qc_warp_dtype = "uint8"
+
+if __name__ == "__main__":
+    test_dark_display_keeps_orientation()